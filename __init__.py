@@ -1,19 +1,60 @@
 import base64
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from io import BytesIO
+import math
 import os
+import random
 import sys
 import tempfile
+import threading
 import time
 import numpy as np
-import requests
 import torch
 from PIL import Image
 from typing import Dict, Tuple
 
 from .install import download_installer, run_installer
-from .nim import ModelType, NIMManager, OffloadingPolicy
+from .nim import ModelType, NIMManager, OffloadingPolicy, build_payload
 
-manager = NIMManager()
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_manager() -> NIMManager:
+    """The NIMManager shared by the nodes, created on first use so importing the package stays cheap"""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = NIMManager()
+        return _manager
+
+# Number of frames of a sequence being encoded, generated or decoded at the same time
+SEQUENCE_IN_FLIGHT = 3
+
+
+def _comfy_image_to_bytes(img: torch.tensor, depth: int = 8):
+    max_val = 2**depth - 1
+    img = torch.clip(img * max_val, 0, max_val).to(dtype=torch.uint8)
+    pil_img = Image.fromarray(img.squeeze(0).cpu().numpy())
+
+    img_byte_arr = BytesIO()
+    pil_img.save(img_byte_arr, format="PNG")
+    return img_byte_arr.getvalue(), ".png"
+
+
+def _comfy_image_to_data_url(img: torch.tensor) -> str:
+    image_bytes, _ = _comfy_image_to_bytes(img=img)
+    base64_string = base64.b64encode(image_bytes).decode('utf-8')
+    return f"data:image/png;base64,{base64_string}"
+
+
+def _artifact_to_tensor(artifact: dict) -> torch.Tensor:
+    """Decode a NIM response artifact into a [1, H, W, 3] ComfyUI image"""
+    img_bytes = base64.b64decode(artifact["base64"])
+    image = Image.open(BytesIO(img_bytes))
+    image = image.convert("RGB")
+    image = np.array(image).astype(np.float32) / 255.0
+    return torch.from_numpy(image)[None,]
 
 class NIMFLUXNode:
     def __init__(self):
@@ -71,6 +112,14 @@ class NIMFLUXNode:
             },
             "optional": {
                 "image": ("IMAGE", {"tooltip": "The image used for depth, canny & kontext mode."}),
+                "samples": ("INT", {
+                    "default": 1,
+                    "min": 1,
+                    "max": 8,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "Number of images to generate per request, returned as a batch."
+                }),
             },
         }
 
@@ -78,7 +127,7 @@ class NIMFLUXNode:
     FUNCTION = "generate"
     CATEGORY = "NVIDIA/NIM"
 
-    def generate(self, width, height, prompt, cfg_scale, seed, steps, is_nim_started, image=None):
+    def generate(self, width, height, prompt, cfg_scale, seed, steps, is_nim_started, image=None, samples=1):
         # Validate that width and height are divisible by 32
         error_messages = []
         if width % 32 != 0:
@@ -91,70 +140,260 @@ class NIMFLUXNode:
         if is_nim_started[0] == "":
             raise Exception("Please make sure use 'Load NIM' before this node to start NIM.")
         model_name = ModelType[is_nim_started[0]]
-        port = manager.get_port(model_name)
-        invoke_url = f"http://localhost:{port}/v1/infer"
-
-        mode = NIMManager._get_variant(self, model_name)
 
         if model_name.value.split('_')[-1].lower() == 'schnell':
             cfg_scale = 0
             if steps > 4:
                 raise Exception("Flux Schnell step value must be between 1-4 steps")
-    
-        payload = {
-            "width": int(width),
-            "height": int(height),
-            "text_prompts": [
-                {
-                    "text": prompt,
-                },
-            ],
-            "mode": mode,
-            "cfg_scale": cfg_scale,
-            "seed": seed,
-            "steps": steps
-        }
-        
-        print(f'Payload is: payload {payload}')
-        
+
         if model_name.value.split('_')[-1].lower() not in ['schnell', 'dev', 'base']:
             if image is None:
                 raise Exception("Please use load image node to select image input for FLUX depth, canny and kontext modes.")
+
+            if image.shape[0] > 1:
+                return (self.generate_sequence(model_name, width, height, prompt, cfg_scale, seed, steps, image, samples),)
+
+            image = _comfy_image_to_data_url(img=image)
+        else:
+            image = None
+
+        payload = build_payload(model_name, width, height, prompt, cfg_scale, seed, steps, image=image, samples=samples)
         
-            def _comfy_image_to_bytes(img: torch.tensor, depth: int = 8):
-                max_val = 2**depth - 1
-                img = torch.clip(img * max_val, 0, max_val).to(dtype=torch.uint8)
-                pil_img = Image.fromarray(img.squeeze(0).cpu().numpy())
-
-                img_byte_arr = BytesIO()
-                pil_img.save(img_byte_arr, format="PNG")
-                return img_byte_arr.getvalue(), ".png"
-            
-            image_bytes, _ = _comfy_image_to_bytes(img=image)
-            base64_string = base64.b64encode(image_bytes).decode('utf-8')
-            image = f"data:image/png;base64,{base64_string}"
-            payload.update({"image": image})
-
-        try:
-            response = requests.post(invoke_url, json=payload)
-            print(response)
-        except requests.exceptions.ConnectionError:
-            raise ConnectionError("Unable to connect to NIM API.")
-            
-        data = response.json()
-        response.raise_for_status()
-        img_base64 = data["artifacts"][0]["base64"]
-        img_bytes = base64.b64decode(img_base64)
-
-        print("Result: " + data["artifacts"][0]["finishReason"])
-
-        image = Image.open(BytesIO(img_bytes))
-        image = image.convert("RGB")
-        image = np.array(image).astype(np.float32) / 255.0
-        image = torch.from_numpy(image)[None,]  
+        print(f'Payload is: payload {payload}')
+
+        image = _infer_samples(model_name, payload, samples)
 
         return (image,)
 
+    def generate_sequence(self, model_name, width, height, prompt, cfg_scale, seed, steps, frames, samples=1):
+        """
+        Generates `samples` images per frame of a batched conditioning image.
+
+        Up to SEQUENCE_IN_FLIGHT frames are processed at once, so encoding, inference
+        and decoding of neighbouring frames overlap while only a bounded number of
+        encoded frames and responses are held in memory. All frames share one seed.
+        """
+        if seed == 0:
+            seed = random.randint(1, 4294967295)
+        frame_count = frames.shape[0]
+        print(f"Generating a sequence of {frame_count} frames with seed {seed}")
+
+        def run_frame(index):
+            payload = build_payload(model_name, width, height, prompt, cfg_scale, seed, steps,
+                                    image=_comfy_image_to_data_url(frames[index:index + 1]), samples=samples)
+            return _infer_samples(model_name, payload, samples)
+
+        output = None
+        next_frame = 0
+        in_flight = {}
+        with ThreadPoolExecutor(max_workers=SEQUENCE_IN_FLIGHT) as executor:
+            while next_frame < frame_count or in_flight:
+                while next_frame < frame_count and len(in_flight) < SEQUENCE_IN_FLIGHT:
+                    in_flight[executor.submit(run_frame, next_frame)] = next_frame
+                    next_frame += 1
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = in_flight.pop(future)
+                    frame = future.result()
+                    if output is None:
+                        output = torch.empty((frame_count * samples,) + tuple(frame.shape[1:]), dtype=frame.dtype)
+                    output[index * samples:(index + 1) * samples] = frame
+                    print(f"Frame {index + 1}/{frame_count} done")
+        return output
+
+
+def _infer_samples(model_name: ModelType, payload: dict, samples: int) -> torch.Tensor:
+    """Runs a payload and decodes every returned artifact into one [N, H, W, 3] batch"""
+    artifacts = get_manager().infer_samples(model_name, payload, samples)
+    for artifact in artifacts:
+        print("Result: " + artifact["finishReason"])
+    return torch.cat([_artifact_to_tensor(artifact) for artifact in artifacts])
+
+
+def _tile_starts(length: int, tile: int, overlap: int) -> list:
+    """Evenly spaced start offsets of tiles of size `tile` covering `length` with at least `overlap` shared pixels"""
+    if length <= tile:
+        return [0]
+    count = math.ceil((length - overlap) / (tile - overlap))
+    return [round(i * (length - tile) / (count - 1)) for i in range(count)]
+
+
+def _feather_ramp(size: int, overlap: int, fade_in: bool, fade_out: bool) -> torch.Tensor:
+    ramp = torch.ones(size)
+    edge = torch.linspace(0, 1, overlap + 2)[1:-1]
+    if fade_in:
+        ramp[:overlap] = edge
+    if fade_out:
+        ramp[size - overlap:] = edge.flip(0)
+    return ramp
+
+
+class NIMTiledFLUXNode:
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "is_nim_started": ("STRING", {"forceInput": True}),
+                "width": ("INT", {
+                    "default": 2048,
+                    "min": 672,
+                    "max": 8192,
+                    "step": 32,
+                    "display": "number",
+                    "tooltip": "Width of the full canvas to generate, in pixels."
+                }),
+                "height": ("INT", {
+                    "default": 2048,
+                    "min": 672,
+                    "max": 8192,
+                    "step": 32,
+                    "display": "number",
+                    "tooltip": "Height of the full canvas to generate, in pixels."
+                }),
+                "tile_width": ("INT", {
+                    "default": 1024,
+                    "min": 672,
+                    "max": 1568,
+                    "step": 32,
+                    "display": "number",
+                    "tooltip": "Width of each tile sent to the NIM, in pixels."
+                }),
+                "tile_height": ("INT", {
+                    "default": 1024,
+                    "min": 672,
+                    "max": 1568,
+                    "step": 32,
+                    "display": "number",
+                    "tooltip": "Height of each tile sent to the NIM, in pixels."
+                }),
+                "overlap": ("INT", {
+                    "default": 128,
+                    "min": 32,
+                    "max": 512,
+                    "step": 32,
+                    "display": "number",
+                    "tooltip": "Minimum overlap between neighbouring tiles, blended with a linear feather."
+                }),
+                "prompt": ("STRING", {
+                    "multiline": True,
+                    "default": "beautiful scenery nature glass bottle landscape, purple galaxy bottle",
+                    "tooltip": "The attributes you want to include in the image."
+                }),
+                "cfg_scale": ("FLOAT", {
+                    "default": 5.0,
+                    "min": 1.0,
+                    "max": 9.0,
+                    "step": 0.5,
+                    "display": "slider",
+                    "tooltip": "How strictly the diffusion process adheres to the prompt text (higher values keep your image closer to your prompt)"
+                }),
+                "seed": ("INT", {
+                    "default": 0,
+                    "min": 0,
+                    "max": 4294967295,
+                    "display": "number",
+                    "tooltip": "The seed which governs generation, each tile uses seed + tile index. Use 0 for a random seed"
+                }),
+                "steps": ("INT", {
+                    "default": 50,
+                    "min": 1,
+                    "max": 100,
+                    "step": 1,
+                    "display": "slider",
+                    "tooltip": "Number of diffusion steps to run"
+                }),
+                "max_concurrency": ("INT", {
+                    "default": 2,
+                    "min": 1,
+                    "max": 16,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "Maximum number of tile requests in flight at once."
+                }),
+            },
+            "optional": {
+                "image": ("IMAGE", {"tooltip": "The image used for depth, canny & kontext mode. It is resized to the canvas and cropped per tile, which keeps the tiles consistent with each other. Without it (dev, schnell and base models) every tile is a separate image of the full prompt, so the result is a blended collage rather than one coherent picture."}),
+            },
+        }
+
+    RETURN_TYPES = ("IMAGE",)
+    FUNCTION = "generate"
+    CATEGORY = "NVIDIA/NIM"
+
+    def generate(self, width, height, tile_width, tile_height, overlap, prompt, cfg_scale, seed, steps, max_concurrency, is_nim_started, image=None):
+        error_messages = []
+        for name, value in (("Width", width), ("Height", height), ("Tile width", tile_width), ("Tile height", tile_height)):
+            if value % 32 != 0:
+                error_messages.append(f"{name} ({value}) must be divisible by 32.")
+        if overlap >= min(tile_width, tile_height):
+            error_messages.append(f"Overlap ({overlap}) must be smaller than the tile size.")
+        if error_messages:
+            raise ValueError(" ".join(error_messages))
+
+        if is_nim_started[0] == "":
+            raise Exception("Please make sure use 'Load NIM' before this node to start NIM.")
+        model_name = ModelType[is_nim_started[0]]
+
+        if model_name.value.split('_')[-1].lower() == 'schnell':
+            cfg_scale = 0
+            if steps > 4:
+                raise Exception("Flux Schnell step value must be between 1-4 steps")
+
+        condition = None
+        if model_name.value.split('_')[-1].lower() not in ['schnell', 'dev', 'base']:
+            if image is None:
+                raise Exception("Please use load image node to select image input for FLUX depth, canny and kontext modes.")
+            # [1, H, W, C] -> [1, C, H, W] for interpolation, then back
+            condition = torch.nn.functional.interpolate(
+                image[:1].movedim(-1, 1), size=(height, width), mode="bilinear", align_corners=False
+            ).movedim(1, -1)
+
+        if condition is None:
+            print("Tiled generation without a conditioning image: each tile is generated independently from the full prompt")
+
+        tile_width = min(tile_width, width)
+        tile_height = min(tile_height, height)
+        xs = _tile_starts(width, tile_width, overlap)
+        ys = _tile_starts(height, tile_height, overlap)
+        print(f"Generating {width}x{height} as {len(xs)}x{len(ys)} tiles of {tile_width}x{tile_height}")
+
+        def run_tile(index, x, y):
+            tile_image = None
+            if condition is not None:
+                tile_image = _comfy_image_to_data_url(condition[:, y:y + tile_height, x:x + tile_width])
+            tile_seed = (seed + index) % 4294967296 if seed != 0 else 0
+            payload = build_payload(model_name, tile_width, tile_height, prompt, cfg_scale, tile_seed, steps, image=tile_image)
+            data = get_manager().infer(model_name, payload)
+            return _artifact_to_tensor(data["artifacts"][0])[0]
+
+        canvas = torch.zeros((height, width, 3))
+        weights = torch.zeros((height, width, 1))
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            futures = {}
+            for j, y in enumerate(ys):
+                for i, x in enumerate(xs):
+                    futures[executor.submit(run_tile, j * len(xs) + i, x, y)] = (i, j)
+            for future in as_completed(futures):
+                i, j = futures.pop(future)
+                x, y = xs[i], ys[j]
+                try:
+                    tile = future.result()
+                except Exception:
+                    # drop the queued tiles instead of generating the rest of a canvas that is lost anyway
+                    executor.shutdown(wait=False, cancel_futures=True)
+                    raise
+                mask = torch.outer(
+                    _feather_ramp(tile_height, overlap, j > 0, j < len(ys) - 1),
+                    _feather_ramp(tile_width, overlap, i > 0, i < len(xs) - 1)
+                )[..., None]
+                canvas[y:y + tile_height, x:x + tile_width] += tile * mask
+                weights[y:y + tile_height, x:x + tile_width] += mask
+
+        return ((canvas / weights)[None,],)
+
 
 class LoadNIMNode:
     def __init__(self):
@@ -179,6 +418,12 @@ class LoadNIMNode:
                     "tooltip": "Input your Huggingface API Token"
                 }),
                 "is_nim_installed": ("BOOLEAN", {"forceInput": True}),
+            },
+            "optional": {
+                "wait_until_ready": ("BOOLEAN", {
+                    "default": True,
+                    "tooltip": "Wait for the NIM to be ready before continuing. When disabled the NIM starts in the background and NIM Generate waits for it, so other nodes can run in the meantime."
+                }),
             }
         }
     
@@ -189,21 +434,30 @@ class LoadNIMNode:
     FUNCTION = "prcoess_nim"
     CATEGORY = "NVIDIA/NIM"
 
-    def prcoess_nim(self, model_type: str, operation: str, offloading_policy: str, hf_token: str, is_nim_installed: bool):
+    @classmethod
+    def IS_CHANGED(s, model_type: str, operation: str, **kwargs):
+        # run again after a failed background start, ComfyUI would otherwise reuse the cached output
+        if operation == "Start" and get_manager().deploy_failed(ModelType[model_type]):
+            return float("nan")
+        return ""
+
+    def prcoess_nim(self, model_type: str, operation: str, offloading_policy: str, hf_token: str, is_nim_installed: bool, wait_until_ready: bool = True):
         if is_nim_installed:
             if operation == "Start":
-                return (self.start_nim(model_type, offloading_policy, hf_token),)
+                return (self.start_nim(model_type, offloading_policy, hf_token, wait_until_ready),)
             elif operation == "Stop":
                 return (self.stop_nim(model_type),)
         else:
             raise Exception("Please make sure install NIMs before running this node")
     
-    def start_nim(self, model_type: str, offloading_policy: str, hf_token: str):
-        manager.deploy_nim(model_name=ModelType[model_type], offloading_policy=offloading_policy, hf_token=hf_token)
+    def start_nim(self, model_type: str, offloading_policy: str, hf_token: str, wait_until_ready: bool = True):
+        ready = get_manager().deploy_nim_async(model_name=ModelType[model_type], offloading_policy=offloading_policy, hf_token=hf_token)
+        if wait_until_ready:
+            ready.result()
         return (model_type,)
     
     def stop_nim(self, model_type: str):
-        manager.stop_nim(model_name=ModelType[model_type])
+        get_manager().stop_nim(model_name=ModelType[model_type])
         return ("",)
 
 
@@ -226,7 +480,7 @@ class InstallNIMNode:
     
     def install_nim(self):
         if os.name == 'nt':
-            if manager.is_wsl_distribution_installed(distro_name="NVIDIA-Workbench"):
+            if get_manager().is_wsl_distribution_installed(distro_name="NVIDIA-Workbench"):
                 print("NIM node setup is ready.")
                 return (True, )
             else:
@@ -246,6 +500,46 @@ class InstallNIMNode:
 
         return (False,)
 
+class NIMLogsNode:
+    def __init__(self):
+        pass
+
+    @classmethod
+    def INPUT_TYPES(s):
+        return {
+            "required": {
+                "model_type": ([e.value for e in ModelType], {
+                    "default": ModelType.FLUX_DEV.value,
+                    "tooltip": "The NIM model whose container logs are shown"
+                }),
+                "lines": ("INT", {
+                    "default": 100,
+                    "min": 1,
+                    "max": 2000,
+                    "step": 1,
+                    "display": "number",
+                    "tooltip": "Number of most recent log lines to return"
+                }),
+            }
+        }
+
+    RETURN_TYPES = ("STRING",)
+    RETURN_NAMES = ("logs",)
+    OUTPUT_NODE = True
+    FUNCTION = "get_logs"
+    CATEGORY = "NVIDIA/NIM"
+
+    @classmethod
+    def IS_CHANGED(s, model_type, lines):
+        # logs change while the container runs, always re-read them
+        return float("nan")
+
+    def get_logs(self, model_type: str, lines: int) -> Tuple[str]:
+        log_lines = get_manager().tail_logs(ModelType[model_type], lines)
+        print("\n".join(log_lines))
+        return ("\n".join(log_lines),)
+
+
 class Get_HFToken:
     def __init__(self):
         pass
@@ -281,6 +575,8 @@ NODE_CLASS_MAPPINGS = {
     "LoadNIMNode": LoadNIMNode,
     "InstallNIMNode": InstallNIMNode,
     "NIMFLUXNode": NIMFLUXNode,
+    "NIMTiledFLUXNode": NIMTiledFLUXNode,
+    "NIMLogsNode": NIMLogsNode,
     "Get_HFToken": Get_HFToken
 }
 
@@ -288,5 +584,7 @@ NODE_DISPLAY_NAME_MAPPINGS = {
     "LoadNIMNode": "Load NIM",
     "InstallNIMNode": "Install NIM",
     "NIMFLUXNode": "NIM Generate",
+    "NIMTiledFLUXNode": "NIM Tiled Generate",
+    "NIMLogsNode": "NIM Container Logs",
     "Get_HFToken": "Use HF_TOKEN EnVar"
 }
\ No newline at end of file
@@ -0,0 +1,233 @@
+'''
+Headless bulk generation from a JSONL file of jobs.
+
+Each line of the jobs file is one job, for example:
+
+    {"id": "cat-01", "model": "FLUX_DEV", "prompt": "a cat", "width": 1024, "height": 1024, "steps": 30, "seed": 7}
+    {"id": "edge-01", "model": "FLUX_CANNY", "prompt": "a house", "image": "inputs/house.png", "samples": 2}
+
+Only "model" and "prompt" are required. Images are written to the output folder as
+they finish, together with a `results.jsonl` manifest. Jobs that cannot be read, or name
+an unknown model, are recorded there as errors without stopping the run. Running the
+same command again skips the jobs the manifest already records as done, so an
+interrupted run resumes where it stopped. The containers started by the run are
+stopped when it exits.
+
+Usage (from the ComfyUI custom_nodes folder):
+
+    python -m NIMNodes.batch jobs.jsonl --output out/
+'''
+import argparse
+import base64
+import json
+import mimetypes
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .nim import ModelType, NIMManager, OffloadingPolicy, build_payload
+
+MANIFEST_NAME = "results.jsonl"
+DEFAULT_CONCURRENCY = 2
+
+JOB_DEFAULTS = {
+    "width": 1024,
+    "height": 1024,
+    "cfg_scale": 5.0,
+    "seed": 0,
+    "steps": 50,
+    "samples": 1,
+}
+
+
+def read_jobs(jobs_path: str):
+    """
+    Yield (job id, job, error) for every non-empty line of a JSONL jobs file.
+
+    `error` describes why the line is not a valid job, `job` is None then.
+    """
+    with open(jobs_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            job_id = str(line_number)
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("job is not a JSON object")
+                job = {**JOB_DEFAULTS, **job}
+                job_id = str(job.get("id", line_number))
+                if job.get("model") not in ModelType.__members__:
+                    raise ValueError(f"unknown model {job.get('model')!r}")
+                if "prompt" not in job:
+                    raise ValueError("job has no prompt")
+            except ValueError as e:
+                yield job_id, None, f"line {line_number}: {e}"
+                continue
+            yield job_id, job, None
+
+
+def read_completed(manifest_path: str) -> set:
+    """Ids of the jobs a previous run already finished successfully"""
+    completed = set()
+    if not os.path.exists(manifest_path):
+        return completed
+    with open(manifest_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # the last line may be cut off when a run is killed
+                continue
+            if entry.get("status") == "ok":
+                completed.add(str(entry["id"]))
+    return completed
+
+
+def _image_to_data_url(image_path: str) -> str:
+    mime_type = mimetypes.guess_type(image_path)[0] or "image/png"
+    with open(image_path, "rb") as f:
+        return f"data:{mime_type};base64,{base64.b64encode(f.read()).decode('utf-8')}"
+
+
+def run_job(manager: NIMManager, job_id: str, job: dict, output_dir: str) -> list:
+    """Generate the images of one job and write them to `output_dir`, returns the file names"""
+    model_name = ModelType[job["model"]]
+    cfg_scale = job["cfg_scale"]
+    if model_name == ModelType.FLUX_SCHNELL:
+        cfg_scale = 0
+        if job["steps"] > 4:
+            raise ValueError("Flux Schnell step value must be between 1-4 steps")
+    image = job.get("image")
+    if NIMManager._get_variant(model_name) != "base" or model_name == ModelType.FLUX_KONTEXT:
+        if image is None:
+            raise ValueError(f"{model_name.value} jobs need an image")
+    payload = build_payload(
+        model_name, job["width"], job["height"], job["prompt"], cfg_scale, job["seed"], job["steps"],
+        image=_image_to_data_url(image) if image else None, samples=job["samples"]
+    )
+
+    files = []
+    for i, artifact in enumerate(manager.infer_samples(model_name, payload, job["samples"])):
+        image_bytes = base64.b64decode(artifact["base64"])
+        extension = ".png" if image_bytes.startswith(b"\x89PNG") else ".jpg"
+        file_name = f"{job_id}_{i}{extension}"
+        with open(os.path.join(output_dir, file_name), "wb") as f:
+            f.write(image_bytes)
+        files.append(file_name)
+    return files
+
+
+def run_batch(manager: NIMManager, jobs_path: str, output_dir: str, offloading_policy: str, hf_token: str,
+              concurrency: dict, warmup: bool = True) -> dict:
+    """
+    Runs every job of `jobs_path` that is not yet recorded as done in the manifest.
+
+    Containers of all models used by the jobs are started in the background first, jobs
+    of each model then run with at most `concurrency[model]` requests in flight. On
+    KeyboardInterrupt the queued jobs are dropped, the requests in flight still finish
+    and are recorded.
+
+    Returns:
+        dict: Count of jobs per status ("ok", "error", "skipped").
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    completed = read_completed(manifest_path)
+
+    models = {ModelType[job["model"]] for job_id, job, error in read_jobs(jobs_path) if job and job_id not in completed}
+    for model_name in models:
+        manager.deploy_nim_async(model_name, offloading_policy, hf_token, warmup)
+
+    limits = {model_name: concurrency.get(model_name, DEFAULT_CONCURRENCY) for model_name in models}
+    executors = {
+        model_name: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"NIMBatch-{model_name.value}")
+        for model_name, limit in limits.items()
+    }
+    # bound the jobs held in memory to twice the total number of request slots
+    in_flight = threading.BoundedSemaphore(max(1, 2 * sum(limits.values())))
+    manifest_lock = threading.Lock()
+    counts = {"ok": 0, "error": 0, "skipped": len(completed)}
+
+    def record(entry):
+        with manifest_lock:
+            counts[entry["status"]] += 1
+            with open(manifest_path, "a", encoding="utf-8") as manifest:
+                manifest.write(json.dumps(entry) + "\n")
+                manifest.flush()
+                os.fsync(manifest.fileno())
+        print(f"[{entry['status']}] {entry['id']} ({entry['seconds']}s)" + (f": {entry['error']}" if "error" in entry else ""))
+
+    def process(job_id, job):
+        start_time = time.time()
+        entry = {"id": job_id, "model": job["model"], "seed": job["seed"]}
+        try:
+            entry.update({"status": "ok", "files": run_job(manager, job_id, job, output_dir)})
+        except Exception as e:
+            entry.update({"status": "error", "error": str(e)})
+        entry["seconds"] = round(time.time() - start_time, 2)
+        record(entry)
+
+    interrupted = False
+    try:
+        for job_id, job, error in read_jobs(jobs_path):
+            if job_id in completed:
+                continue
+            if error is not None:
+                record({"id": job_id, "status": "error", "error": error, "seconds": 0})
+                continue
+            if job["seed"] == 0:
+                # fix the seed up front so the manifest records how to reproduce the image
+                job["seed"] = random.randint(1, 4294967295)
+            in_flight.acquire()
+            future = executors[ModelType[job["model"]]].submit(process, job_id, job)
+            future.add_done_callback(lambda _: in_flight.release())
+    except KeyboardInterrupt:
+        interrupted = True
+        print("Interrupted, waiting for the requests in flight to finish...")
+        raise
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True, cancel_futures=interrupted)
+    return counts
+
+
+def _parse_concurrency(values: list) -> dict:
+    concurrency = {}
+    for value in values or []:
+        model, _, limit = value.partition("=")
+        concurrency[ModelType[model]] = int(limit)
+    return concurrency
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a JSONL file of NIM generation jobs without running ComfyUI.")
+    parser.add_argument("jobs", help="Path to the JSONL file of jobs")
+    parser.add_argument("-o", "--output", required=True, help="Folder for the images and the results manifest")
+    parser.add_argument("--offloading-policy", default=OffloadingPolicy.DEFAULT.value,
+                        choices=[e.value for e in OffloadingPolicy], help="Offloading policy of started containers")
+    parser.add_argument("--hf-token", default=os.environ.get("HF_TOKEN", ""), help="Hugging Face token, defaults to HF_TOKEN")
+    parser.add_argument("--concurrency", action="append", metavar="MODEL=N",
+                        help=f"Requests in flight per model, e.g. FLUX_DEV=3 (default {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip the warmup requests after a container starts")
+    args = parser.parse_args(argv)
+
+    # the manager stops the containers it started when the interpreter exits
+    manager = NIMManager()
+    try:
+        counts = run_batch(
+            manager, args.jobs, args.output, args.offloading_policy, args.hf_token,
+            _parse_concurrency(args.concurrency), warmup=not args.no_warmup
+        )
+    except KeyboardInterrupt:
+        print("Interrupted, run the same command again to resume")
+        return 130
+    print(f"Done: {counts['ok']} succeeded, {counts['error']} failed, {counts['skipped']} already completed")
+    return 1 if counts["error"] else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
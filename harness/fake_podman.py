@@ -0,0 +1,264 @@
+'''
+Stand-in for the `podman` commands NIMManager runs, serving a fake NIM instead of a real container.
+
+`podman run` stays in the foreground and serves /v1/health/ready and /v1/infer on the
+published host port. Container state lives in $FAKE_PODMAN_STATE, one JSON file per
+container, and notable events are appended to events.jsonl there.
+
+The fake NIM is configured through environment variables:
+
+    FAKE_NIM_STARTUP_DELAY  seconds before /v1/health/ready returns 200 (default 2)
+    FAKE_NIM_INFER_DELAY    seconds spent in each /v1/infer request (default 0.2)
+    FAKE_NIM_CRASH_RATE     chance that a container exits during startup (default 0)
+    FAKE_NIM_HANG_RATE      chance that a container stops answering after startup (default 0)
+    FAKE_NIM_PULL_DELAY     seconds spent in `podman pull` (default 0)
+'''
+import json
+import os
+import random
+import signal
+import sys
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+STATE_DIR = os.environ.get("FAKE_PODMAN_STATE", os.path.join(os.path.expanduser("~"), ".fake_podman"))
+
+# 1x1 grey PNG returned as every generated image
+PNG_BASE64 = (
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAAAAAA6fptVAAAACklEQVR4nGNoAAAAggCBd81ytgAAAABJRU5ErkJggg=="
+)
+
+
+def _env_float(name, default):
+    return float(os.environ.get(name, default))
+
+
+def log_event(event, **fields):
+    with open(os.path.join(STATE_DIR, "events.jsonl"), "a") as f:
+        f.write(json.dumps({"event": event, "time": time.time(), "pid": os.getpid(), **fields}) + "\n")
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def load_containers():
+    """Returns the state of every container whose process is still alive, dropping the others"""
+    containers = {}
+    for name in os.listdir(STATE_DIR):
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(STATE_DIR, name)
+        try:
+            with open(path) as f:
+                container = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            continue
+        if is_alive(container["pid"]):
+            containers[container["name"]] = container
+        else:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    return containers
+
+
+def parse_run_args(args):
+    name, port, image = None, None, None
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        if arg.startswith("--name="):
+            name = arg.split("=", 1)[1]
+        elif arg == "--name":
+            i += 1
+            name = args[i]
+        elif arg == "-p":
+            i += 1
+            port = int(args[i].split(":")[0])
+        elif arg in ("-e", "-v"):
+            i += 1
+        elif not arg.startswith("-"):
+            image = arg
+        i += 1
+    return name, port, image
+
+
+class FakeNIMHandler(BaseHTTPRequestHandler):
+    ready_at = 0.0
+    hung = threading.Event()
+
+    def log_message(self, format, *args):
+        pass
+
+    def _reply(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _maybe_hang(self):
+        if self.hung.is_set():
+            # never answer, like a wedged inference server
+            time.sleep(3600)
+
+    def do_GET(self):
+        self._maybe_hang()
+        if self.path == "/v1/health/ready":
+            if time.time() >= self.ready_at:
+                self._reply(200, {"status": "ready"})
+            else:
+                self._reply(503, {"status": "starting"})
+        else:
+            self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        self._maybe_hang()
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        if self.path != "/v1/infer":
+            self._reply(404, {"error": "not found"})
+            return
+        if time.time() < self.ready_at:
+            self._reply(503, {"error": "not ready"})
+            return
+        time.sleep(_env_float("FAKE_NIM_INFER_DELAY", 0.2))
+        artifacts = [
+            {"base64": PNG_BASE64, "finishReason": "SUCCESS", "seed": payload.get("seed", 0) + i}
+            for i in range(int(payload.get("samples", 1)))
+        ]
+        self._reply(200, {"artifacts": artifacts})
+
+
+def cmd_run(args):
+    name, port, image = parse_run_args(args)
+    if name in load_containers():
+        sys.stderr.write(f'Error: creating container storage: the container name "{name}" is already in use\n')
+        log_event("name_conflict", name=name, port=port)
+        return 125
+
+    try:
+        server = ThreadingHTTPServer(("127.0.0.1", port), FakeNIMHandler)
+    except OSError as e:
+        sys.stderr.write(f"Error: rootlessport listen tcp 0.0.0.0:{port}: bind: address already in use\n")
+        log_event("bind_failed", name=name, port=port, error=str(e))
+        return 126
+
+    container = {"name": name, "id": uuid.uuid4().hex, "image": image, "port": port, "pid": os.getpid()}
+    state_path = os.path.join(STATE_DIR, f"{name}.json")
+    with open(state_path, "w") as f:
+        json.dump(container, f)
+    log_event("started", name=name, port=port)
+
+    def shutdown(signum, frame):
+        log_event("stopped", name=name, port=port)
+        try:
+            os.remove(state_path)
+        except FileNotFoundError:
+            pass
+        os._exit(0)
+
+    signal.signal(signal.SIGTERM, shutdown)
+    signal.signal(signal.SIGINT, shutdown)
+
+    startup_delay = _env_float("FAKE_NIM_STARTUP_DELAY", 2)
+    FakeNIMHandler.ready_at = time.time() + startup_delay
+    print(f"Starting fake NIM {name} on port {port}", flush=True)
+
+    if random.random() < _env_float("FAKE_NIM_CRASH_RATE", 0):
+        def crash():
+            time.sleep(random.uniform(0, startup_delay))
+            log_event("crashed", name=name, port=port)
+            os.remove(state_path)
+            os._exit(1)
+        threading.Thread(target=crash, daemon=True).start()
+    elif random.random() < _env_float("FAKE_NIM_HANG_RATE", 0):
+        def hang():
+            time.sleep(startup_delay + random.uniform(0, 5))
+            log_event("hung", name=name, port=port)
+            FakeNIMHandler.hung.set()
+        threading.Thread(target=hang, daemon=True).start()
+
+    server.serve_forever()
+    return 0
+
+
+def cmd_stop(args):
+    names = [arg for arg in args if not arg.startswith("-")]
+    containers = load_containers()
+    status = 0
+    for name in names:
+        container = containers.get(name)
+        if container is None:
+            sys.stderr.write(f'Error: no container with name or ID "{name}" found: no such container\n')
+            status = 125
+            continue
+        try:
+            os.kill(container["pid"], signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        deadline = time.time() + 10
+        while is_alive(container["pid"]) and time.time() < deadline:
+            time.sleep(0.05)
+        if is_alive(container["pid"]):
+            os.kill(container["pid"], signal.SIGKILL)
+        print(name)
+    return status
+
+
+def cmd_ls(args):
+    containers = [
+        {
+            "Id": container["id"],
+            "Image": container["image"],
+            "Names": [container["name"]],
+            "Ports": [{"host_port": container["port"], "container_port": 8000}],
+        }
+        for container in load_containers().values()
+    ]
+    print(json.dumps(containers))
+    return 0
+
+
+def cmd_pull(args):
+    time.sleep(_env_float("FAKE_NIM_PULL_DELAY", 0))
+    sys.stderr.write(f"Pulled {args[-1] if args else ''}\n")
+    return 0
+
+
+def main(argv):
+    os.makedirs(STATE_DIR, exist_ok=True)
+    if not argv:
+        sys.stderr.write("usage: podman <command> [args]\n")
+        return 125
+    command, args = argv[0], argv[1:]
+    if command == "container" and args[:1] == ["ls"]:
+        return cmd_ls(args[1:])
+    if command in ("ps", "ls"):
+        return cmd_ls(args)
+    if command == "run":
+        return cmd_run(args)
+    if command == "stop":
+        return cmd_stop(args)
+    if command == "pull":
+        return cmd_pull(args)
+    if command == "login":
+        print("Login Succeeded!")
+        return 0
+    sys.stderr.write(f"fake podman: unsupported command {command}\n")
+    return 125
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,248 @@
+'''
+Lifecycle churn and soak test of NIMManager against fake podman and fake NIM servers.
+
+Runs concurrent start, stop, evict and generate operations without GPUs or real
+images and reports lifecycle latency, errors, leaked threads, leaked processes and
+port collisions. Linux only, since the fake podman is put on PATH as a shell script.
+
+    python harness/lifecycle.py --workers 8 --operations 200 --crash-rate 0.1 --hang-rate 0.05
+
+See fake_podman.py for the behaviour of the fake containers.
+'''
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import random
+import signal
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import types
+from collections import Counter, defaultdict
+from pathlib import Path
+
+HARNESS_DIR = Path(__file__).resolve().parent
+REPO_DIR = HARNESS_DIR.parent
+PACKAGE = "nimnodes_harness"
+OPERATIONS = ("start", "stop", "evict", "generate")
+
+
+def load_nim_module():
+    """Import nim.py as part of the package without running __init__.py, which registers the ComfyUI nodes"""
+    package = types.ModuleType(PACKAGE)
+    package.__path__ = [str(REPO_DIR)]
+    sys.modules[PACKAGE] = package
+    return importlib.import_module(f"{PACKAGE}.nim")
+
+
+def setup_environment(work_dir: str, args) -> str:
+    """Put the fake podman on PATH and point HOME and the fake state at `work_dir`"""
+    bin_dir = os.path.join(work_dir, "bin")
+    state_dir = os.path.join(work_dir, "state")
+    os.makedirs(bin_dir)
+    os.makedirs(state_dir)
+    shim = os.path.join(bin_dir, "podman")
+    with open(shim, "w") as f:
+        f.write(f'#!/bin/sh\nexec "{sys.executable}" "{HARNESS_DIR / "fake_podman.py"}" "$@"\n')
+    os.chmod(shim, 0o755)
+
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+    os.environ["HOME"] = work_dir
+    os.environ["FAKE_PODMAN_STATE"] = state_dir
+    os.environ["FAKE_NIM_STARTUP_DELAY"] = str(args.startup_delay)
+    os.environ["FAKE_NIM_INFER_DELAY"] = str(args.infer_delay)
+    os.environ["FAKE_NIM_CRASH_RATE"] = str(args.crash_rate)
+    os.environ["FAKE_NIM_HANG_RATE"] = str(args.hang_rate)
+    return state_dir
+
+
+def read_events(state_dir: str) -> list:
+    path = os.path.join(state_dir, "events.jsonl")
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def live_containers() -> list:
+    result = subprocess.run("podman container ls -a --format json", shell=True, capture_output=True)
+    return json.loads(result.stdout or b"[]")
+
+
+def is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class CollisionSampler(threading.Thread):
+    '''Periodically looks for two containers, or two managed models, sharing a host port'''
+
+    def __init__(self, manager, interval: float = 0.5):
+        super().__init__(name="CollisionSampler", daemon=True)
+        self.manager = manager
+        self.interval = interval
+        self.collisions = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            ports = defaultdict(set)
+            for container in live_containers():
+                for port in container["Ports"]:
+                    ports[port["host_port"]].update(container["Names"])
+            for model_name, info in list(self.manager._nim_server_proc_dict.items()):
+                ports[info["port"]].add(f"managed:{model_name.value}")
+            for port, names in ports.items():
+                containers = {name.replace("managed:", "") for name in names}
+                if len(containers) > 1:
+                    self.collisions.append({"port": port, "containers": sorted(containers), "time": time.time()})
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+def run_worker(nim, manager, models, operations: int, seed: int, warmup: bool, results: list):
+    rng = random.Random(seed)
+    for _ in range(operations):
+        model_name = rng.choice(models)
+        operation = rng.choice(OPERATIONS)
+        start_time = time.time()
+        error = None
+        try:
+            if operation == "start":
+                manager.deploy_nim(model_name, nim.OffloadingPolicy.DEFAULT.value, "fake-token", warmup)
+            elif operation == "stop":
+                manager.stop_nim(model_name)
+            elif operation == "evict":
+                # container killed behind the manager's back, e.g. by the user or an OOM
+                subprocess.run(f"podman stop {model_name.value}", shell=True, capture_output=True)
+            elif operation == "generate":
+                payload = nim.build_payload(model_name, 1024, 1024, "harness", 3.5, 1, 1)
+                manager.infer(model_name, payload)
+        except Exception as e:
+            error = type(e).__name__
+        results.append({"operation": operation, "model": model_name.value, "seconds": time.time() - start_time, "error": error})
+
+
+def summarize(results: list) -> dict:
+    summary = {}
+    for operation in OPERATIONS:
+        runs = [r for r in results if r["operation"] == operation]
+        if not runs:
+            continue
+        latencies = sorted(r["seconds"] for r in runs)
+        summary[operation] = {
+            "count": len(runs),
+            "errors": dict(Counter(r["error"] for r in runs if r["error"])),
+            "p50": round(statistics.median(latencies), 3),
+            "p95": round(latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))], 3),
+            "max": round(latencies[-1], 3),
+        }
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Churn NIMManager against fake podman and fake NIM servers.")
+    parser.add_argument("--models", type=int, default=3, help="Number of distinct models to cycle")
+    parser.add_argument("--workers", type=int, default=8, help="Concurrent worker threads")
+    parser.add_argument("--operations", type=int, default=100, help="Operations per worker")
+    parser.add_argument("--startup-delay", type=float, default=2, help="Seconds before a fake NIM reports ready")
+    parser.add_argument("--infer-delay", type=float, default=0.2, help="Seconds per fake inference request")
+    parser.add_argument("--crash-rate", type=float, default=0.0, help="Chance a fake container crashes during startup")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Chance a fake container hangs after startup")
+    parser.add_argument("--start-timeout", type=float, default=30, help="Seconds to wait for a container to become ready")
+    parser.add_argument("--health-interval", type=float, default=1, help="Seconds between watchdog health probes")
+    parser.add_argument("--no-warmup", action="store_true", help="Skip warmup requests after start")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed of the operation mix")
+    parser.add_argument("--grace", type=float, default=5, help="Seconds to wait after cleanup before looking for leaks")
+    parser.add_argument("--json", help="Also write the report to this file")
+    parser.add_argument("--verbose", action="store_true", help="Show NIMManager output instead of writing it to manager.log")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="nim-harness-")
+    state_dir = setup_environment(work_dir, args)
+    nim = load_nim_module()
+    nim.TIME_OUT = args.start_timeout
+    nim.HEALTH_CHECK_INTERVAL = args.health_interval
+    nim.HEALTH_CHECK_TIME_OUT = 1
+    nim.REQUEST_TIME_OUT = max(5, args.infer_delay * 10)
+    nim.WARMUP_TIME_OUT = max(5, args.infer_delay * 10)
+    models = list(nim.ModelType)[:args.models]
+
+    baseline_threads = set(threading.enumerate())
+    results = []
+    log_path = os.path.join(work_dir, "manager.log")
+    with open(log_path, "w") as log, contextlib.ExitStack() as stack:
+        if not args.verbose:
+            stack.enter_context(contextlib.redirect_stdout(log))
+        manager = nim.NIMManager(api_key="fake-key")
+        sampler = CollisionSampler(manager)
+        sampler.start()
+        start_time = time.time()
+        workers = [
+            threading.Thread(target=run_worker, args=(nim, manager, models, args.operations, args.seed + i, not args.no_warmup, results))
+            for i in range(args.workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        duration = time.time() - start_time
+        sampler.stop()
+
+        manager.cleanup()
+        time.sleep(args.grace)
+
+    leaked_threads = sorted(t.name for t in set(threading.enumerate()) - baseline_threads if t.is_alive())
+    events = read_events(state_dir)
+    started_pids = {e["pid"] for e in events if e["event"] == "started"}
+    leaked_pids = sorted(pid for pid in started_pids if is_alive(pid))
+    for pid in leaked_pids:
+        os.kill(pid, signal.SIGKILL)
+
+    report = {
+        "work_dir": work_dir,
+        "duration": round(duration, 2),
+        "operations": summarize(results),
+        "containers_started": len(started_pids),
+        "container_events": dict(Counter(e["event"] for e in events)),
+        "port_collisions": {
+            "bind_failed": [e for e in events if e["event"] == "bind_failed"],
+            "name_conflicts": [e for e in events if e["event"] == "name_conflict"],
+            "shared_ports": sampler.collisions,
+        },
+        "leaked_threads": leaked_threads,
+        "leaked_processes": leaked_pids,
+    }
+
+    print(f"Ran {len(results)} operations on {len(models)} models with {args.workers} workers in {report['duration']}s")
+    for operation, stats in report["operations"].items():
+        print(f"  {operation:<9} n={stats['count']:<5} p50={stats['p50']:<7} p95={stats['p95']:<7} max={stats['max']:<7} errors={stats['errors']}")
+    print(f"Containers started: {report['containers_started']}, events: {report['container_events']}")
+    print(f"Port collisions: {len(report['port_collisions']['bind_failed'])} bind failures, "
+          f"{len(report['port_collisions']['name_conflicts'])} name conflicts, "
+          f"{len(report['port_collisions']['shared_ports'])} shared port samples")
+    print(f"Leaked threads: {leaked_threads or 'none'}")
+    print(f"Leaked processes: {leaked_pids or 'none'}")
+    print(f"Manager output: {log_path}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+
+    problems = leaked_threads or leaked_pids or any(report["port_collisions"].values())
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
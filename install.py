@@ -1,22 +1,174 @@
+import hashlib
 import os
 import subprocess
 import requests
 import tempfile
 import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from tqdm.auto import tqdm
 
+DOWNLOAD_CACHE_DIR = os.path.join(Path.home(), ".cache", "nimnodes", "downloads")
+CHUNK_SIZE = 1024 * 1024
+MAX_RETRIES = 3
+DOWNLOAD_TIME_OUT = 60
 
-def download_installer(url, dir):
-    response = requests.get(url, stream=True, allow_redirects=True)
-    response.raise_for_status()
-    file_size = int(response.headers.get('Content-Length', 0))
 
-    with tqdm.wrapattr(response.raw, "read", total=file_size, desc=url) as read:
-        dest = os.path.join(dir, "NIMSetup.exe")
-        with open(dest, "wb") as f:
-            shutil.copyfileobj(read, f)
+def _probe_download(url):
+    """Returns the size, ETag and range support reported by the server for `url`"""
+    try:
+        response = requests.head(url, allow_redirects=True, timeout=DOWNLOAD_TIME_OUT)
+        response.raise_for_status()
+    except requests.exceptions.RequestException:
+        # some servers reject HEAD, ask for the first byte instead
+        with requests.get(url, headers={"Range": "bytes=0-0"}, stream=True, allow_redirects=True, timeout=DOWNLOAD_TIME_OUT) as response:
+            response.raise_for_status()
+            etag = response.headers.get('ETag', "")
+            if response.status_code == 206:
+                total = response.headers.get('Content-Range', "").rpartition("/")[2]
+                return (int(total) if total.isdigit() else 0), etag, True
+            return int(response.headers.get('Content-Length', 0)), etag, False
+    size = int(response.headers.get('Content-Length', 0))
+    etag = response.headers.get('ETag', "")
+    accepts_ranges = response.headers.get('Accept-Ranges', "").lower() == "bytes"
+    return size, etag, accepts_ranges
 
-        return dest
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RangeIgnoredError(Exception):
+    """The server answered a ranged request of one of several segments with the whole file"""
+
+
+def _download_segment(url, etag, path, start, end, progress, only_segment=True):
+    """
+    Downloads bytes [start, end] of `url` into `path`, resuming from the bytes already in it.
+
+    `end` is None when the size is unknown or the server does not support ranges,
+    in which case the whole file is downloaded from scratch. When the server ignores
+    the range of a segment that is not `only_segment`, RangeIgnoredError is raised.
+    """
+    for attempt in range(MAX_RETRIES):
+        done = os.path.getsize(path) if os.path.exists(path) and end is not None else 0
+        if end is not None and start + done > end:
+            return
+        headers = {}
+        if end is not None:
+            headers["Range"] = f"bytes={start + done}-{end}"
+            # If-Range only accepts strong validators, servers ignore the range for a weak one
+            if etag and not etag.startswith("W/"):
+                headers["If-Range"] = etag
+        try:
+            with requests.get(url, headers=headers, stream=True, allow_redirects=True, timeout=DOWNLOAD_TIME_OUT) as response:
+                response.raise_for_status()
+                if end is not None and response.status_code != 206:
+                    if not only_segment:
+                        raise RangeIgnoredError(f"Server ignored the range {headers['Range']} of {url}")
+                    # the server ignored the range (or the file changed), start over
+                    progress.update(-done)
+                    done = 0
+                    if start != 0:
+                        raise Exception("Server does not support ranged downloads")
+                remaining = end - start + 1 - done if end is not None else None
+                with open(path, "ab" if done else "wb") as f:
+                    for chunk in response.iter_content(chunk_size=CHUNK_SIZE):
+                        if remaining is not None:
+                            # never let a part grow past its segment
+                            chunk = chunk[:remaining]
+                            remaining -= len(chunk)
+                        f.write(chunk)
+                        progress.update(len(chunk))
+                        if remaining == 0:
+                            break
+            return
+        except requests.exceptions.RequestException as e:
+            if attempt == MAX_RETRIES - 1:
+                raise
+            print(f"Download interrupted ({e}), resuming...")
+
+
+def _download_parts(url, etag, part_paths, bounds, progress):
+    with ThreadPoolExecutor(max_workers=len(bounds)) as executor:
+        futures = [
+            executor.submit(_download_segment, url, etag, part_path, start, end, progress, len(bounds) == 1)
+            for part_path, (start, end) in zip(part_paths, bounds)
+        ]
+        for future in futures:
+            future.result()
+
+
+def download_installer(url, dir, sha256=None, segments=1, cache_dir=DOWNLOAD_CACHE_DIR):
+    """
+    Downloads the installer at `url` into `dir` and returns its path.
+
+    Completed downloads are cached in `cache_dir` keyed by URL and ETag, so repeat
+    installs copy the cached file instead of downloading it again. Interrupted
+    downloads resume with HTTP range requests, optionally split into `segments`
+    parallel ranges, and the result is checked against `sha256` when given.
+    """
+    dest = os.path.join(dir, "NIMSetup.exe")
+    size, etag, accepts_ranges = _probe_download(url)
+
+    os.makedirs(cache_dir, exist_ok=True)
+    key = hashlib.sha256(f"{url}\n{etag}".encode("utf-8")).hexdigest()
+    cache_path = os.path.join(cache_dir, key)
+
+    if os.path.exists(cache_path) and (etag or sha256):
+        if sha256 is None or _file_sha256(cache_path) == sha256.lower():
+            print(f"Using cached download of {url}")
+            shutil.copyfile(cache_path, dest)
+            return dest
+        os.remove(cache_path)
+
+    if size and accepts_ranges:
+        segments = max(1, min(segments, size // CHUNK_SIZE or 1))
+        bounds = [(i * size // segments, (i + 1) * size // segments - 1) for i in range(segments)]
+    else:
+        bounds = [(0, None)]
+    # partial files of a previous run with a different segment count cannot be resumed
+    for name in os.listdir(cache_dir):
+        if name.startswith(f"{key}.part") and not name.startswith(f"{key}.part{len(bounds)}-"):
+            os.remove(os.path.join(cache_dir, name))
+    part_paths = [os.path.join(cache_dir, f"{key}.part{len(bounds)}-{i}") for i in range(len(bounds))]
+
+    resumed = sum(os.path.getsize(p) for p in part_paths if os.path.exists(p)) if bounds[0][1] is not None else 0
+    with tqdm(total=size or None, initial=resumed, unit="B", unit_scale=True, desc=url) as progress:
+        try:
+            _download_parts(url, etag, part_paths, bounds, progress)
+        except RangeIgnoredError as e:
+            print(f"{e}, downloading the whole file instead")
+            for part_path in part_paths:
+                if os.path.exists(part_path):
+                    os.remove(part_path)
+            bounds = [(0, None)]
+            part_paths = [os.path.join(cache_dir, f"{key}.part1-0")]
+            progress.reset(total=size or None)
+            _download_parts(url, etag, part_paths, bounds, progress)
+
+    tmp_path = f"{cache_path}.tmp"
+    with open(tmp_path, "wb") as out:
+        for part_path in part_paths:
+            with open(part_path, "rb") as part:
+                shutil.copyfileobj(part, out, CHUNK_SIZE)
+    for part_path in part_paths:
+        os.remove(part_path)
+
+    if size and os.path.getsize(tmp_path) != size:
+        os.remove(tmp_path)
+        raise Exception(f"Downloaded size of {url} does not match the expected {size} bytes")
+    if sha256 is not None and _file_sha256(tmp_path) != sha256.lower():
+        os.remove(tmp_path)
+        raise Exception(f"Checksum mismatch for {url}, the download may be corrupted")
+
+    os.replace(tmp_path, cache_path)
+    shutil.copyfile(cache_path, dest)
+    return dest
 
 
 def run_installer(installer_path):
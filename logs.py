@@ -0,0 +1,79 @@
+import logging
+import os
+import threading
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from typing import List, Tuple
+
+LOG_BUFFER_LINES = 2000
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 3
+
+
+class ContainerLogBuffer:
+    '''
+    Keeps the most recent output lines of a NIM container in a fixed-size ring buffer.
+
+    Every line gets a sequence number, so a reader can follow the output with
+    `read_since` without the buffer holding on to lines it has already dropped.
+    When `log_dir` is set, lines are also written to a rotated `<name>.log` file.
+    '''
+
+    def __init__(self, name: str, max_lines: int = LOG_BUFFER_LINES, log_dir: str = None):
+        self.name = name
+        self._lines = deque(maxlen=max_lines)
+        self._count = 0
+        self._lock = threading.Lock()
+        self._logger = None
+        self._handler = None
+        if log_dir:
+            os.makedirs(log_dir, exist_ok=True)
+            self._handler = RotatingFileHandler(
+                os.path.join(log_dir, f"{name}.log"),
+                maxBytes=LOG_FILE_MAX_BYTES,
+                backupCount=LOG_FILE_BACKUP_COUNT,
+                encoding="utf-8"
+            )
+            self._handler.setFormatter(logging.Formatter("%(asctime)s %(message)s"))
+            self._logger = logging.getLogger(f"nimnodes.container.{name}")
+            self._logger.setLevel(logging.INFO)
+            self._logger.propagate = False
+            self._logger.addHandler(self._handler)
+
+    def append(self, line: str) -> None:
+        line = line.rstrip("\r\n")
+        with self._lock:
+            self._lines.append(line)
+            self._count += 1
+        logger = self._logger
+        if logger is not None:
+            logger.info(line)
+
+    def tail(self, lines: int = 100) -> List[str]:
+        """Return up to `lines` of the most recent output lines"""
+        with self._lock:
+            if lines <= 0:
+                return []
+            return list(self._lines)[-lines:]
+
+    def read_since(self, seq: int) -> Tuple[List[str], int]:
+        """
+        Returns the lines appended after sequence number `seq`.
+
+        Lines that already fell out of the ring buffer are skipped.
+
+        Returns:
+            Tuple[List[str], int]: The new lines and the sequence number to pass next time.
+        """
+        with self._lock:
+            available = min(self._count - seq, len(self._lines))
+            if available <= 0:
+                return [], self._count
+            return list(self._lines)[-available:], self._count
+
+    def close(self) -> None:
+        if self._handler is not None:
+            self._logger.removeHandler(self._handler)
+            self._handler.close()
+            self._handler = None
+            self._logger = None
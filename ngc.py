@@ -70,6 +70,42 @@ def get_device_info_nvml():
         nvml.nvmlShutdown()
         return []
 
+def get_gpu_memory_info():
+    """
+    Returns free/total memory in bytes and utilization in percent for every GPU.
+
+    Returns an empty list when NVML is not available.
+    """
+    try:
+        nvml.nvmlInit()
+    except nvml.NVMLError as e:
+        print(f"NVML Error: {e}")
+        return []
+    try:
+        deviceCount = nvml.nvmlDeviceGetCount()
+        gpuInfo = []
+        for i in range(deviceCount):
+            handle = nvml.nvmlDeviceGetHandleByIndex(i)
+            memory = nvml.nvmlDeviceGetMemoryInfo(handle)
+            try:
+                utilization = nvml.nvmlDeviceGetUtilizationRates(handle).gpu
+            except nvml.NVMLError:
+                utilization = 0
+            gpuInfo.append({
+                'index': i,
+                'uuid': nvml.nvmlDeviceGetUUID(handle),
+                'name': nvml.nvmlDeviceGetName(handle),
+                'total': memory.total,
+                'free': memory.free,
+                'utilization': utilization,
+            })
+        return gpuInfo
+    except nvml.NVMLError as e:
+        print(f"NVML Error: {e}")
+        return []
+    finally:
+        nvml.nvmlShutdown()
+
 def get_device_info_smi():
     try:
         output = subprocess.check_output(['nvidia-smi', '-q'], text=True)
@@ -1,20 +1,31 @@
 import os
-import socket
 import subprocess
 from enum import Enum
 from pathlib import Path
-from .ngc import get_ngc_key
+from .ngc import get_gpu_memory_info, get_ngc_key
+from .logs import ContainerLogBuffer
+from .placement import PlacementPlanner
 import time
 import re
 import atexit
+from concurrent.futures import Future
 from typing import List
 import sys
 import json
 import requests
 import threading
-import queue
+import base64
+from io import BytesIO
+from PIL import Image
 
 TIME_OUT = 1800
+WARMUP_TIME_OUT = 600
+REQUEST_TIME_OUT = 900
+HEALTH_CHECK_INTERVAL = 10
+HEALTH_CHECK_TIME_OUT = 5
+MAX_HEALTH_FAILURES = 3
+CIRCUIT_RESET_TIME = 30
+CANCEL_TIME_OUT = 30
 
 class ModelType(Enum):
     FLUX_DEV = "FLUX_DEV"
@@ -32,6 +43,83 @@ class OffloadingPolicy(Enum):
     SYS = "System RAM"
     DISK = "Disk"
     DEFAULT = "Default"
+    AUTO = "Auto"
+
+
+def build_payload(model_name: ModelType, width: int, height: int, prompt: str, cfg_scale: float, seed: int, steps: int, image: str = None, samples: int = 1) -> dict:
+    """Build the /v1/infer request body for the given model"""
+    payload = {
+        "width": int(width),
+        "height": int(height),
+        "text_prompts": [
+            {
+                "text": prompt,
+            },
+        ],
+        "mode": NIMManager._get_variant(model_name),
+        "cfg_scale": cfg_scale,
+        "seed": seed,
+        "steps": steps
+    }
+    if image is not None:
+        payload.update({"image": image})
+    if samples > 1:
+        payload.update({"samples": int(samples)})
+    return payload
+
+
+class CircuitBreaker:
+    '''
+    Tracks consecutive failures of a NIM endpoint so callers can fail fast.
+
+    The circuit opens after `failure_threshold` failures. Once `reset_timeout`
+    seconds have passed a single trial request is let through (half-open); its
+    outcome closes or re-opens the circuit.
+    '''
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None):
+        # read the module settings at construction, not import, so they can be tuned at runtime
+        self.failure_threshold = MAX_HEALTH_FAILURES if failure_threshold is None else failure_threshold
+        self.reset_timeout = CIRCUIT_RESET_TIME if reset_timeout is None else reset_timeout
+        self.failures = 0
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._lock = threading.RLock()
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.time() - self.opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.trip()
+
+    def trip(self) -> None:
+        with self._lock:
+            self.state = self.OPEN
+            self.opened_at = time.time()
+
+    def abandon_trial(self) -> None:
+        """Give up a half-open trial that never reached the endpoint, the next request may try again"""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
 
 class NIMManager:
     '''
@@ -55,10 +143,74 @@ class NIMManager:
     }
     PORT = 5000
 
-    def __init__(self):
+    # Approximate memory footprints in GB, used to pick an offloading policy automatically:
+    # vram - everything resident on the GPU (policy None)
+    # offload_vram - minimum free VRAM while offloading
+    # offload_ram - host RAM needed when offloading to System RAM
+    MODEL_FOOTPRINTS: dict[ModelType, dict] = {
+        ModelType.FLUX_DEV: {"vram": 24, "offload_vram": 12, "offload_ram": 32},
+        ModelType.FLUX_CANNY: {"vram": 24, "offload_vram": 12, "offload_ram": 32},
+        ModelType.FLUX_DEPTH: {"vram": 24, "offload_vram": 12, "offload_ram": 32},
+        ModelType.FLUX_SCHNELL: {"vram": 24, "offload_vram": 12, "offload_ram": 32},
+        ModelType.FLUX_KONTEXT: {"vram": 24, "offload_vram": 12, "offload_ram": 32},
+        ModelType.SD35L_BASE: {"vram": 32, "offload_vram": 16, "offload_ram": 40},
+        ModelType.SD35L_CANNY: {"vram": 32, "offload_vram": 16, "offload_ram": 40},
+        ModelType.SD35L_DEPTH: {"vram": 32, "offload_vram": 16, "offload_ram": 40},
+    }
+
+    # Throwaway requests sent once a container reports ready, so the first-shape
+    # initialization of the common resolutions does not land on the user's request.
+    WARMUP_PROFILES: dict[ModelType, list[dict]] = {
+        ModelType.FLUX_DEV: [
+            {"width": 1024, "height": 1024, "steps": 1},
+            {"width": 768, "height": 1344, "steps": 1},
+            {"width": 1344, "height": 768, "steps": 1},
+        ],
+        ModelType.FLUX_CANNY: [
+            {"width": 1024, "height": 1024, "steps": 1},
+        ],
+        ModelType.FLUX_DEPTH: [
+            {"width": 1024, "height": 1024, "steps": 1},
+        ],
+        ModelType.FLUX_SCHNELL: [
+            {"width": 1024, "height": 1024, "steps": 1},
+            {"width": 768, "height": 1344, "steps": 1},
+            {"width": 1344, "height": 768, "steps": 1},
+        ],
+        ModelType.FLUX_KONTEXT: [
+            {"width": 1024, "height": 1024, "steps": 1},
+        ],
+        ModelType.SD35L_BASE: [
+            {"width": 1024, "height": 1024, "steps": 1},
+        ],
+        ModelType.SD35L_CANNY: [
+            {"width": 1024, "height": 1024, "steps": 1},
+        ],
+        ModelType.SD35L_DEPTH: [
+            {"width": 1024, "height": 1024, "steps": 1},
+        ],
+    }
+
+    def __init__(self, api_key: str = None):
         self._nim_server_proc_dict: dict[ModelType, dict] = {}
-        self.api_key = get_ngc_key()
+        self._circuits: dict[ModelType, CircuitBreaker] = {}
+        self._watchdog_thread = None
+        self._watchdog_stop = threading.Event()
+        self._log_buffers: dict[ModelType, ContainerLogBuffer] = {}
+        self._pending_deploys: dict[ModelType, Future] = {}
+        # Set to abort the pull or start of a background deployment
+        self._cancel_events: dict[ModelType, threading.Event] = {}
+        # Models whose last background deployment failed, so the Load NIM node runs again
+        self._failed_deploys: set[ModelType] = set()
+        # Models whose NIM rejected a multi-sample request, these are split client-side from then on
+        self._multi_sample_unsupported: set[ModelType] = set()
+        # Optional directory for rotated on-disk copies of the container logs
+        self.log_dir = os.environ.get("NIM_LOG_DIR")
+        self.api_key = api_key or get_ngc_key()
         self.cache_path = self._get_cache_path()
+        self.placement = PlacementPlanner(base_port=self.PORT)
+        self._start_locks: dict[ModelType, threading.Lock] = {}
+        self._start_locks_guard = threading.Lock()
         atexit.register(self.cleanup)
         self.cmd_prefix = ""
         if os.name == 'nt':
@@ -189,6 +341,9 @@ class NIMManager:
         # self._run_cmd(command, "pull NIM")
         process = self._run_proc(command)
         while True:
+            if self._is_cancelled(model_name):
+                process.kill()
+                raise Exception(f"Pull of NIM {model_name.value} was cancelled")
             output = process.stderr.readline()
             exit_code = process.poll()
             if exit_code != None:
@@ -230,7 +385,8 @@ class NIMManager:
             self.stop_nim(model_name, force=True)
         return False
 
-    def _get_variant(self, model_name: ModelType):
+    @staticmethod
+    def _get_variant(model_name: ModelType):
         if model_name.value.endswith("CANNY"):
             return "canny"
         elif model_name.value.endswith("DEPTH"):
@@ -244,28 +400,140 @@ class NIMManager:
         else:
             return "base"
 
-    def start_nim_container(self, model_name: ModelType, offloading_policy: OffloadingPolicy, hf_token: str = "") -> None:
+    def _warmup_image(self, width: int, height: int) -> str:
+        """Neutral conditioning image used by the canny, depth and kontext warmup requests"""
+        img_byte_arr = BytesIO()
+        Image.new("RGB", (width, height), (128, 128, 128)).save(img_byte_arr, format="PNG")
+        return f"data:image/png;base64,{base64.b64encode(img_byte_arr.getvalue()).decode('utf-8')}"
+
+    def warmup_nim(self, model_name: ModelType, port: int) -> float:
+        """
+        Runs the warmup profile of a model as throwaway requests.
+
+        Args:
+            model_name (ModelType): The model whose profile is run.
+            port (int): The host port of the running container.
+
+        Returns:
+            float: Total warmup time in seconds.
+        """
+        invoke_url = f"http://localhost:{port}/v1/infer"
+        needs_image = self._get_variant(model_name) != "base" or model_name == ModelType.FLUX_KONTEXT
+        is_schnell = model_name == ModelType.FLUX_SCHNELL
+        timings = []
+        start_time = time.time()
+        for profile in self.WARMUP_PROFILES.get(model_name, []):
+            if self._is_cancelled(model_name):
+                break
+            width, height = profile["width"], profile["height"]
+            image = self._warmup_image(width, height) if needs_image else None
+            payload = build_payload(
+                model_name,
+                width=width,
+                height=height,
+                prompt="warmup",
+                cfg_scale=0 if is_schnell else profile.get("cfg_scale", 3.5),
+                seed=1,
+                steps=profile["steps"],
+                image=image
+            )
+            profile_start = time.time()
+            try:
+                response = requests.post(invoke_url, json=payload, timeout=WARMUP_TIME_OUT)
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                print(f"Warmup request {width}x{height} for {model_name.value} failed: {e}")
+                continue
+            elapsed = time.time() - profile_start
+            timings.append({"width": width, "height": height, "steps": profile["steps"], "seconds": elapsed})
+            print(f"Warmup {width}x{height} ({profile['steps']} steps) for {model_name.value} took {elapsed:.1f} seconds")
+
+        warmup_time = time.time() - start_time
+        if model_name in self._nim_server_proc_dict:
+            self._nim_server_proc_dict[model_name]["warmup_time"] = warmup_time
+            self._nim_server_proc_dict[model_name]["warmup_timings"] = timings
+        return warmup_time
+
+    def get_free_host_memory(self) -> int:
+        """Free memory in bytes of the host the containers run on (the WSL distribution on Windows)"""
+        try:
+            for line in self._run_cmd("cat /proc/meminfo", "read host memory"):
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+        except Exception as e:
+            print(f"Unable to read host memory: {e}")
+        return 0
+
+
+    def resolve_offloading_policy(self, model_name: ModelType, gpu_index: int = None) -> tuple[str, str]:
+        """
+        Picks the fastest offloading policy that fits the measured free GPU and host memory.
+
+        Args:
+            model_name (ModelType): The model to start.
+            gpu_index (int): The GPU the container is placed on, all GPUs are considered when None.
+
+        Returns:
+            tuple[str, str]: The policy value and the reason it was chosen.
+        """
+        footprint = self.MODEL_FOOTPRINTS[model_name]
+        gpus = [gpu for gpu in get_gpu_memory_info() if gpu_index is None or gpu["index"] == gpu_index]
+        free_vram = max((gpu["free"] for gpu in gpus), default=0) / 1024**3
+        free_ram = self.get_free_host_memory() / 1024**3
+        measured = f"{free_vram:.1f}GB free VRAM, {free_ram:.1f}GB free host RAM"
+
+        if not gpus:
+            return OffloadingPolicy.DEFAULT.value, "GPU memory could not be measured"
+        if free_vram >= footprint["vram"]:
+            return OffloadingPolicy.NONE.value, f"{measured}; model fits in VRAM ({footprint['vram']}GB)"
+        if free_vram >= footprint["offload_vram"] and free_ram >= footprint["offload_ram"]:
+            return OffloadingPolicy.SYS.value, f"{measured}; model needs {footprint['vram']}GB VRAM, offloading to {footprint['offload_ram']}GB of System RAM"
+        if free_vram < footprint["offload_vram"]:
+            return OffloadingPolicy.DISK.value, f"{measured}; below the {footprint['offload_vram']}GB VRAM the model needs, generation may fail"
+        return OffloadingPolicy.DISK.value, f"{measured}; not enough System RAM to offload ({footprint['offload_ram']}GB)"
+
+
+    def start_nim_container(self, model_name: ModelType, offloading_policy: OffloadingPolicy, hf_token: str = "", warmup: bool = True) -> None:
         """Start a NIM container with the specified configuration"""
+        # one start per model at a time, a second caller finds it running
+        with self._start_locks_guard:
+            start_lock = self._start_locks.setdefault(model_name, threading.Lock())
+        with start_lock:
+            self._start_nim_container(model_name, offloading_policy, hf_token, warmup)
+
+
+    def _start_nim_container(self, model_name: ModelType, offloading_policy: OffloadingPolicy, hf_token: str, warmup: bool) -> None:
         if self.is_nim_running(model_name):
             print(f"NIM for {model_name.value} is already running...")
             return
 
+        # Drop what is left of a container that exited on its own, then
+        # reserve a host port and pick the GPU to run on
+        self._release_placement(model_name)
+        placement = self.placement.reserve(model_name.value, self.MODEL_FOOTPRINTS[model_name]["offload_vram"])
+        port = placement["port"]
+        device = "nvidia.com/gpu=all"
+        if placement["gpu_index"] is not None:
+            print(f"Placing NIM {model_name.value} on GPU {placement['gpu_index']}, port {port}")
+            # the WSL CDI spec only exposes all GPUs together
+            if not self.cmd_prefix:
+                device = f"nvidia.com/gpu={placement['gpu_index']}"
+
+        offloading_policy_reason = "selected by user"
+        if offloading_policy == OffloadingPolicy.AUTO.value:
+            offloading_policy, offloading_policy_reason = self.resolve_offloading_policy(model_name, placement["gpu_index"])
+            print(f"Auto offloading policy for {model_name.value}: {offloading_policy} ({offloading_policy_reason})")
+
         self._setup_directories(model_name)
         #cache_path = self.cache_path.format(model_name=model_name.value)
         cache_path = '~/.cache/nim'
-
-        # Check if port is already in use
-        port = self.PORT + len(self._nim_server_proc_dict)
-
-        while self.is_port_in_use(port):
-            port += 1
         
         variant = self._get_variant(model_name)
         
         # show start container logs
         command = (
             f"podman run --rm "
-            f"--device=nvidia.com/gpu=all "
+            f"--device={device} "
             f"--name={model_name.value} "
             f"--shm-size=16GB "
             f"-e NGC_API_KEY={self.api_key} "
@@ -279,65 +547,79 @@ class NIMManager:
         )
         print(command)
         process = self._run_proc(command)
-        self._nim_server_proc_dict[model_name] = {"port": port, "id": None}
+        self._nim_server_proc_dict[model_name] = {
+            "port": port,
+            "gpu_index": placement["gpu_index"],
+            "id": None,
+            "ready": False,
+            "status": "starting",
+            "health_failures": 0,
+            "offloading_policy": offloading_policy,
+            "offloading_policy_reason": offloading_policy_reason,
+            "hf_token": hf_token,
+        }
 
         invoke_url = f"http://localhost:{port}/v1/health/ready"
         start_time = time.time()
 
-        # read podman container logs
-        def read_process_stdout(process, output_queue):
-            """ read stdout and put on the queue """
-            for line in iter(process.stdout.readline, b''):
-                output_queue.put(line.decode('utf-8'))
-            process.stdout.close()
-
-        def read_process_stderr(process, output_queue):
-            """ read stderr and put on the queue """
-            for line in iter(process.stderr.readline, b''):
-                output_queue.put(line.decode('utf-8'))
-            process.stderr.close()
-        
-        stdout_queue = queue.Queue()
-        stderr_queue = queue.Queue()
-        stdout_thread = threading.Thread(target=read_process_stdout, args=(process, stdout_queue), daemon=True)
-        stderr_thread = threading.Thread(target=read_process_stderr, args=(process, stderr_queue), daemon=True)
+        # read podman container logs into a bounded ring buffer, kept across restarts of the model
+        log_buffer = self._log_buffers.get(model_name)
+        if log_buffer is None:
+            log_buffer = ContainerLogBuffer(model_name.value, log_dir=self.log_dir)
+            self._log_buffers[model_name] = log_buffer
+
+        def read_process_output(stream, log_buffer):
+            """ read a process stream line by line into the log buffer """
+            for line in iter(stream.readline, b''):
+                log_buffer.append(line.decode('utf-8', errors='replace'))
+            stream.close()
+
+        _, log_seq = log_buffer.read_since(0)
+        stdout_thread = threading.Thread(target=read_process_output, args=(process.stdout, log_buffer), daemon=True)
+        stderr_thread = threading.Thread(target=read_process_output, args=(process.stderr, log_buffer), daemon=True)
         stdout_thread.start()
         stderr_thread.start()
 
         while True:
             time.sleep(1)
+            log_lines, log_seq = log_buffer.read_since(log_seq)
+            for log_line in log_lines:
+                sys.stdout.write(log_line + "\n")
+            sys.stdout.flush()
             try:
-                log_line = stdout_queue.get_nowait()
-                if log_line:
-                    sys.stdout.write(log_line)
-                    sys.stdout.flush()
-            except queue.Empty:
-                pass  
-            try:
-                log_line = stderr_queue.get_nowait()
-                if log_line:
-                    sys.stdout.write(log_line)
-                    sys.stdout.flush()
-            except queue.Empty:
-                pass  
-            try:
-                response = requests.get(invoke_url)
+                response = requests.get(invoke_url, timeout=HEALTH_CHECK_TIME_OUT)
                 if response.status_code == 200:
                     wait_time = time.time() - start_time
-                    print(f"NIM service endpoint is up and running after waiting {round(wait_time)} seconds!")
-                    return
+                    print(f"NIM service endpoint is up after waiting {round(wait_time)} seconds, warming up...")
+                    break
             except:
                 pass
 
+            if self._is_cancelled(model_name):
+                self._abort_start(model_name, process)
+                raise Exception(f"Start of NIM {model_name.value} was cancelled")
+
+            exit_code = process.poll()
+            if exit_code is not None:
+                self._release_placement(model_name)
+                raise Exception(f"NIM container {model_name.value} exited with code {exit_code} before it was ready, see the NIM Container Logs node for details.")
+
             if time.time() - start_time > TIME_OUT:
+                self._abort_start(model_name, process)
                 raise TimeoutError("NIM Server did not start within the specified timeout.")
 
+        if warmup:
+            warmup_time = self.warmup_nim(model_name, port)
+            print(f"Warmup for {model_name.value} completed in {round(warmup_time)} seconds")
+        if self._is_cancelled(model_name):
+            raise Exception(f"Start of NIM {model_name.value} was cancelled")
+        self._nim_server_proc_dict[model_name]["ready"] = True
+        self._nim_server_proc_dict[model_name]["status"] = "ready"
+        self.get_circuit(model_name).record_success()
+        self.start_watchdog()
+        wait_time = time.time() - start_time
+        print(f"NIM service endpoint is up and running after waiting {round(wait_time)} seconds!")
 
-    def is_port_in_use(self, port: int) -> bool:
-        """Check if a port is already in use"""
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            return s.connect_ex(('localhost', port)) == 0
-        
 
     def get_port(self, model_name: ModelType) -> int:
         if not self.is_nim_running(model_name):
@@ -348,7 +630,190 @@ class NIMManager:
         return containers_data[model_name.value]["port"]
 
 
-    def deploy_nim(self, model_name: ModelType, offloading_policy: OffloadingPolicy, hf_token: str) -> None:
+    def tail_logs(self, model_name: ModelType, lines: int = 100) -> List[str]:
+        """
+        Returns the most recent output lines of a NIM container.
+
+        Logs stay available after the container has stopped or crashed, until the
+        model is started again in a new session.
+        """
+        if model_name not in self._log_buffers:
+            return []
+        return self._log_buffers[model_name].tail(lines)
+
+
+    def get_circuit(self, model_name: ModelType) -> CircuitBreaker:
+        if model_name not in self._circuits:
+            self._circuits[model_name] = CircuitBreaker()
+        return self._circuits[model_name]
+
+
+    def infer(self, model_name: ModelType, payload: dict, timeout: float = None) -> dict:
+        """
+        Sends a request to the /v1/infer endpoint of a running NIM.
+
+        Fails fast while the circuit of the model is open instead of waiting on a
+        container that the watchdog has already found unhealthy.
+
+        Returns:
+            dict: The decoded JSON response.
+        """
+        if timeout is None:
+            timeout = REQUEST_TIME_OUT
+        self.wait_for_nim(model_name)
+        circuit = self.get_circuit(model_name)
+        if not circuit.allow_request():
+            raise ConnectionError(f"NIM {model_name.value} is unhealthy and being recovered, please retry shortly.")
+
+        try:
+            port = self.get_port(model_name)
+        except Exception:
+            circuit.abandon_trial()
+            raise
+        invoke_url = f"http://localhost:{port}/v1/infer"
+        try:
+            response = requests.post(invoke_url, json=payload, timeout=timeout)
+            print(response)
+        except requests.exceptions.Timeout:
+            circuit.record_failure()
+            raise TimeoutError(f"NIM {model_name.value} did not respond within {timeout} seconds.")
+        except requests.exceptions.ConnectionError:
+            circuit.record_failure()
+            raise ConnectionError("Unable to connect to NIM API.")
+        except requests.exceptions.RequestException:
+            circuit.abandon_trial()
+            raise
+
+        # a 4xx is the request's fault, the endpoint itself answered
+        if response.status_code >= 500:
+            circuit.record_failure()
+        else:
+            circuit.record_success()
+        response.raise_for_status()
+        return response.json()
+
+
+    def infer_samples(self, model_name: ModelType, payload: dict, samples: int) -> List[dict]:
+        """
+        Requests `samples` images and returns their artifacts.
+
+        Asks the NIM for all samples in a single request. When the NIM rejects that, or
+        returns fewer artifacts, the rest are requested one by one with seed + i. The model
+        is only remembered as not supporting multiple samples when the rejection names
+        `samples` or a single-sample request then succeeds, so a bad prompt or size is not
+        mistaken for it.
+        """
+        artifacts = []
+        unconfirmed_rejection = False
+        if samples > 1 and model_name not in self._multi_sample_unsupported:
+            try:
+                artifacts = self.infer(model_name, payload)["artifacts"][:samples]
+            except requests.exceptions.HTTPError as e:
+                if e.response is None or e.response.status_code >= 500:
+                    raise
+                if "samples" in e.response.text:
+                    self._mark_multi_sample_unsupported(model_name)
+                else:
+                    unconfirmed_rejection = True
+
+        single_payload = {k: v for k, v in payload.items() if k != "samples"}
+        for i in range(len(artifacts), samples):
+            if payload["seed"] != 0:
+                single_payload["seed"] = (payload["seed"] + i) % 4294967296
+            artifacts.extend(self.infer(model_name, single_payload)["artifacts"][:1])
+            if unconfirmed_rejection:
+                self._mark_multi_sample_unsupported(model_name)
+                unconfirmed_rejection = False
+        return artifacts
+
+
+    def _mark_multi_sample_unsupported(self, model_name: ModelType) -> None:
+        print(f"NIM {model_name.value} does not support multiple samples per request, splitting client-side")
+        self._multi_sample_unsupported.add(model_name)
+
+
+    def start_watchdog(self) -> None:
+        """Start the background health watchdog if it is not running yet"""
+        if self._watchdog_thread is not None and self._watchdog_thread.is_alive():
+            return
+        self._watchdog_stop.clear()
+        self._watchdog_thread = threading.Thread(target=self._watchdog_loop, name="NIMWatchdog", daemon=True)
+        self._watchdog_thread.start()
+
+
+    def _watchdog_loop(self) -> None:
+        while not self._watchdog_stop.wait(HEALTH_CHECK_INTERVAL):
+            for model_name, info in list(self._nim_server_proc_dict.items()):
+                if not info.get("ready") or info.get("status") == "recovering":
+                    continue
+                try:
+                    self.check_health(model_name)
+                except Exception as e:
+                    print(f"Watchdog error while checking {model_name.value}: {e}")
+
+
+    def check_health(self, model_name: ModelType) -> bool:
+        """
+        Probes /v1/health/ready of a running NIM and updates its status and circuit.
+
+        A container that has disappeared, or that fails MAX_HEALTH_FAILURES probes
+        in a row, is restarted in the background.
+
+        Returns:
+            bool: True if the NIM answered the probe.
+        """
+        info = self._nim_server_proc_dict.get(model_name)
+        if info is None:
+            return False
+        circuit = self.get_circuit(model_name)
+        try:
+            response = requests.get(f"http://localhost:{info['port']}/v1/health/ready", timeout=HEALTH_CHECK_TIME_OUT)
+            healthy = response.status_code == 200
+        except requests.exceptions.RequestException:
+            healthy = False
+
+        if healthy:
+            if info["status"] != "ready":
+                print(f"NIM {model_name.value} is healthy again")
+            info["health_failures"] = 0
+            info["status"] = "ready"
+            circuit.record_success()
+            return True
+
+        info["health_failures"] += 1
+        info["status"] = "degraded"
+        circuit.trip()
+        print(f"NIM {model_name.value} failed health check ({info['health_failures']}/{MAX_HEALTH_FAILURES})")
+
+        container_gone = model_name.value not in self.get_running_container_info()
+        if container_gone or info["health_failures"] >= MAX_HEALTH_FAILURES:
+            info["status"] = "recovering"
+            threading.Thread(target=self._recover_nim, args=(model_name,), daemon=True).start()
+        return False
+
+
+    def _recover_nim(self, model_name: ModelType) -> None:
+        """Restart a dead or hung NIM with the offloading policy and token it was started with"""
+        info = self._nim_server_proc_dict.get(model_name)
+        if info is None:
+            return
+        print(f"Restarting NIM {model_name.value}...")
+        try:
+            self._run_cmd(f"podman stop {model_name.value}", f"stop NIM {model_name.value}")
+        except Exception:
+            pass
+        if self._nim_server_proc_dict.get(model_name) is not info:
+            # stopped by the user while we were tearing it down
+            return
+        self._release_placement(model_name)
+        try:
+            self.start_nim_container(model_name, info["offloading_policy"], info["hf_token"])
+            print(f"NIM {model_name.value} recovered")
+        except Exception as e:
+            print(f"Failed to recover NIM {model_name.value}: {e}")
+
+
+    def deploy_nim(self, model_name: ModelType, offloading_policy: OffloadingPolicy, hf_token: str, warmup: bool = True) -> None:
         """Deploy a NIM model with all necessary setup"""
         # Setup directories
         self._setup_directories(model_name)
@@ -360,24 +825,124 @@ class NIMManager:
         self.start_nim_container(
             model_name,
             offloading_policy,
-            hf_token
+            hf_token,
+            warmup
         )
     
 
+    def deploy_nim_async(self, model_name: ModelType, offloading_policy: OffloadingPolicy, hf_token: str, warmup: bool = True) -> Future:
+        """
+        Deploys a NIM model in the background.
+
+        Returns immediately with a future that resolves once the container is ready.
+        `infer` waits on it, so callers only block when they actually need the endpoint.
+
+        Returns:
+            Future: The readiness handle of the deployment.
+        """
+        pending = self._pending_deploys.get(model_name)
+        if pending is not None and not pending.done():
+            return pending
+        future = Future()
+        cancel_event = threading.Event()
+        self._cancel_events[model_name] = cancel_event
+        self._failed_deploys.discard(model_name)
+
+        def run():
+            # a daemon thread rather than an executor, so a pending start never holds up interpreter exit
+            future.set_running_or_notify_cancel()
+            try:
+                self.deploy_nim(model_name, offloading_policy, hf_token, warmup)
+                future.set_result(None)
+            except BaseException as e:
+                self._failed_deploys.add(model_name)
+                future.set_exception(e)
+            finally:
+                if self._cancel_events.get(model_name) is cancel_event:
+                    del self._cancel_events[model_name]
+
+        self._pending_deploys[model_name] = future
+        threading.Thread(target=run, name=f"NIMDeploy-{model_name.value}", daemon=True).start()
+        return future
+
+
+    def deploy_failed(self, model_name: ModelType) -> bool:
+        """Whether the last background deployment of the model failed"""
+        return model_name in self._failed_deploys
+
+
+    def _is_cancelled(self, model_name: ModelType) -> bool:
+        cancel_event = self._cancel_events.get(model_name)
+        return cancel_event is not None and cancel_event.is_set()
+
+
+    def wait_for_nim(self, model_name: ModelType, timeout: float = None) -> None:
+        """Block until a background deployment of the model has finished, re-raising its error if it failed"""
+        if timeout is None:
+            timeout = TIME_OUT
+        pending = self._pending_deploys.get(model_name)
+        if pending is None:
+            return
+        if not pending.done():
+            print(f"Waiting for NIM {model_name.value} to become ready...")
+        try:
+            pending.result(timeout=timeout)
+        except Exception as e:
+            if not pending.done():
+                # still starting, only this wait timed out
+                raise
+            # forget the failed deployment, so later requests do not keep re-raising it
+            if self._pending_deploys.get(model_name) is pending:
+                del self._pending_deploys[model_name]
+            raise Exception(f"Starting NIM {model_name.value} failed: {e}. Queue the prompt again to restart it with the Load NIM node.") from e
+
+
     def stop_nim(self, model_name: ModelType, force: bool = False) -> None:
         if not force:
+            pending = self._pending_deploys.pop(model_name, None)
+            if pending is not None and not pending.done():
+                # abort the pull or start in flight, it gives up within a second or so
+                cancel_event = self._cancel_events.get(model_name)
+                if cancel_event is not None:
+                    cancel_event.set()
+                try:
+                    pending.result(timeout=CANCEL_TIME_OUT)
+                except Exception:
+                    pass
             if not self.is_nim_running(model_name):
                 print(f"NIM {model_name.value} is already stopped.")
                 return
         command = f"podman stop {model_name.value}"
         self._run_cmd(command, f"stop NIM {model_name.value}")
-        if model_name in self._nim_server_proc_dict:
-            self._nim_server_proc_dict.pop(model_name)
+        self._release_placement(model_name)
         print(f"Stopped NIM {model_name.value}")
 
 
+    def _abort_start(self, model_name: ModelType, process: subprocess.Popen) -> None:
+        """Tear down a container that did not become ready, so neither it nor its port is left behind"""
+        process.terminate()
+        try:
+            # terminating the shell running `podman run` does not always stop the container
+            self._run_cmd(f"podman stop {model_name.value}", f"stop NIM {model_name.value}")
+        except Exception:
+            pass
+        self._release_placement(model_name)
+
+
+    def _release_placement(self, model_name: ModelType) -> None:
+        """Forget a container and give its host port back to the placement planner"""
+        info = self._nim_server_proc_dict.pop(model_name, None)
+        if info is not None:
+            self.placement.release(info["port"])
+
+
     def cleanup(self) -> None:
-        nims = list(self._nim_server_proc_dict.keys())
+        self._watchdog_stop.set()
+        for cancel_event in list(self._cancel_events.values()):
+            cancel_event.set()
+        for log_buffer in self._log_buffers.values():
+            log_buffer.close()
+        nims = list(self._nim_server_proc_dict.keys() | self._pending_deploys.keys())
         for model in nims:
             try:
                 self.stop_nim(model)
@@ -413,5 +978,5 @@ if __name__ == "__main__":
     registry_path = NIMManager.MODEL_REGISTRY[model_name]
 
     manager = NIMManager()
-    manager.deploy_nim(model_name)
+    manager.deploy_nim(model_name, OffloadingPolicy.DEFAULT.value, os.environ.get("HF_TOKEN", ""))
     manager.stop_nim(model_name)
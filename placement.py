@@ -0,0 +1,159 @@
+import json
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from .ngc import get_gpu_memory_info
+
+PLACEMENT_STATE_PATH = os.path.join(Path.home(), ".cache", "nimnodes", "placements.json")
+PORT_RANGE = 1000
+
+if os.name == "nt":
+    import ctypes
+    import msvcrt
+else:
+    import fcntl
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name == "nt":
+        # os.kill(pid, 0) would terminate the process on Windows
+        PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+        STILL_ACTIVE = 259
+        handle = ctypes.windll.kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        exit_code = ctypes.c_ulong()
+        ctypes.windll.kernel32.GetExitCodeProcess(handle, ctypes.byref(exit_code))
+        ctypes.windll.kernel32.CloseHandle(handle)
+        return exit_code.value == STILL_ACTIVE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _port_in_use(port: int) -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        return s.connect_ex(('localhost', port)) == 0
+
+
+class PlacementPlanner:
+    '''
+    Reserves host ports and picks a GPU for each NIM container.
+
+    Reservations live in a JSON state file guarded by a file lock, so concurrent starts in
+    this process and in other ComfyUI processes never hand out the same port. The GPU a
+    model was placed on is remembered, and later starts of that model go back to it as
+    long as it still has room, so warm caches on that device are reused.
+    '''
+
+    def __init__(self, base_port: int, state_path: str = PLACEMENT_STATE_PATH):
+        self.base_port = base_port
+        self.state_path = state_path
+        self._lock = threading.Lock()
+        os.makedirs(os.path.dirname(state_path), exist_ok=True)
+
+    @contextmanager
+    def _locked(self):
+        with self._lock, open(f"{self.state_path}.lock", "a+") as lock_file:
+            if os.name == "nt":
+                lock_file.seek(0)
+                while True:
+                    try:
+                        msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+                        break
+                    except OSError:
+                        # LK_LOCK gives up after 10 seconds, keep waiting
+                        pass
+                try:
+                    yield
+                finally:
+                    lock_file.seek(0)
+                    msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        state.setdefault("reservations", {})
+        state.setdefault("devices", {})
+        # drop ports held by processes that have exited
+        state["reservations"] = {
+            port: reservation for port, reservation in state["reservations"].items()
+            if _pid_alive(reservation["pid"])
+        }
+        return state
+
+    def _save(self, state: dict) -> None:
+        tmp_path = f"{self.state_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+
+    def _pick_gpu(self, state: dict, model_name: str, vram_needed_gb: float):
+        gpus = get_gpu_memory_info()
+        if not gpus:
+            return None
+        needed = vram_needed_gb * 1024**3
+        active = {}
+        for reservation in state["reservations"].values():
+            if reservation.get("gpu_uuid"):
+                active[reservation["gpu_uuid"]] = active.get(reservation["gpu_uuid"], 0) + 1
+
+        previous = state["devices"].get(model_name)
+        if previous:
+            for gpu in gpus:
+                if gpu["uuid"] == previous["gpu_uuid"] and gpu["free"] >= needed:
+                    return gpu
+
+        # least loaded GPU that fits: fewest containers placed on it, then most free memory, then least busy
+        fitting = [gpu for gpu in gpus if gpu["free"] >= needed] or gpus
+        return min(fitting, key=lambda gpu: (active.get(gpu["uuid"], 0), -gpu["free"], gpu["utilization"]))
+
+    def reserve(self, model_name: str, vram_needed_gb: float = 0) -> dict:
+        """
+        Reserves a free host port and a GPU for a container of `model_name`.
+
+        Returns:
+            dict: "port", plus "gpu_index" and "gpu_uuid" (None when no GPU could be queried).
+        """
+        with self._locked():
+            state = self._load()
+            port = self.base_port
+            while str(port) in state["reservations"] or _port_in_use(port):
+                port += 1
+                if port >= self.base_port + PORT_RANGE:
+                    raise Exception(f"No free port between {self.base_port} and {self.base_port + PORT_RANGE}")
+
+            gpu = self._pick_gpu(state, model_name, vram_needed_gb)
+            placement = {
+                "port": port,
+                "gpu_index": gpu["index"] if gpu else None,
+                "gpu_uuid": gpu["uuid"] if gpu else None,
+            }
+            state["reservations"][str(port)] = {"model": model_name, "pid": os.getpid(), "time": time.time(), **placement}
+            if gpu:
+                state["devices"][model_name] = {"gpu_uuid": gpu["uuid"], "gpu_index": gpu["index"]}
+            self._save(state)
+        return placement
+
+    def release(self, port: int) -> None:
+        with self._locked():
+            state = self._load()
+            if state["reservations"].pop(str(port), None) is not None:
+                self._save(state)
@@ -0,0 +1,63 @@
+import importlib
+import json
+import sys
+import types
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "nimnodes_batch_tests"
+
+# import batch.py as part of the package without running __init__.py, which registers the ComfyUI nodes
+package = types.ModuleType(PACKAGE)
+package.__path__ = [str(REPO_DIR)]
+sys.modules[PACKAGE] = package
+batch = importlib.import_module(f"{PACKAGE}.batch")
+
+
+def _write_lines(path, lines):
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return str(path)
+
+
+def test_read_jobs_applies_defaults_and_ids(tmp_path):
+    jobs_path = _write_lines(tmp_path / "jobs.jsonl", [
+        json.dumps({"id": "cat", "model": "FLUX_DEV", "prompt": "a cat", "steps": 30}),
+        "",
+        json.dumps({"model": "FLUX_SCHNELL", "prompt": "a dog"}),
+    ])
+    jobs = list(batch.read_jobs(jobs_path))
+    assert [(job_id, error) for job_id, job, error in jobs] == [("cat", None), ("3", None)]
+    assert jobs[0][1]["steps"] == 30
+    assert jobs[0][1]["width"] == batch.JOB_DEFAULTS["width"]
+    assert jobs[1][1]["seed"] == 0
+
+
+def test_read_jobs_reports_invalid_lines(tmp_path):
+    jobs_path = _write_lines(tmp_path / "jobs.jsonl", [
+        "{not json",
+        json.dumps(["FLUX_DEV"]),
+        json.dumps({"id": "unknown", "model": "NOPE", "prompt": "x"}),
+        json.dumps({"id": "no-prompt", "model": "FLUX_DEV"}),
+    ])
+    jobs = list(batch.read_jobs(jobs_path))
+    assert [job_id for job_id, job, error in jobs] == ["1", "2", "unknown", "no-prompt"]
+    assert all(job is None for job_id, job, error in jobs)
+    errors = [error for job_id, job, error in jobs]
+    assert errors[0].startswith("line 1:")
+    assert "not a JSON object" in errors[1]
+    assert "unknown model 'NOPE'" in errors[2]
+    assert "no prompt" in errors[3]
+
+
+def test_read_completed_skips_errors_and_cut_off_lines(tmp_path):
+    manifest_path = _write_lines(tmp_path / batch.MANIFEST_NAME, [
+        json.dumps({"id": "a", "status": "ok"}),
+        json.dumps({"id": "b", "status": "error", "error": "boom"}),
+        json.dumps({"id": 3, "status": "ok"}),
+        '{"id": "c", "sta',
+    ])
+    assert batch.read_completed(manifest_path) == {"a", "3"}
+
+
+def test_read_completed_without_manifest(tmp_path):
+    assert batch.read_completed(str(tmp_path / batch.MANIFEST_NAME)) == set()
@@ -0,0 +1,130 @@
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+
+# install.py has no package imports, load it on its own rather than through the ComfyUI package
+spec = importlib.util.spec_from_file_location("install", REPO_DIR / "install.py")
+install = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(install)
+
+DATA = os.urandom(3 * install.CHUNK_SIZE + 123)
+DATA_SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+class RangedHandler(BaseHTTPRequestHandler):
+    head_allowed = True
+    honor_ranges = True
+    etag = '"v1"'
+    ranges = []
+
+    def log_message(self, format, *args):
+        pass
+
+    def _headers(self, status, length, extra=None):
+        self.send_response(status)
+        self.send_header("Content-Length", str(length))
+        self.send_header("ETag", self.etag)
+        self.send_header("Accept-Ranges", "bytes")
+        for key, value in (extra or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+
+    def do_HEAD(self):
+        if not self.head_allowed:
+            self._headers(405, 0)
+            return
+        self._headers(200, len(DATA))
+
+    def do_GET(self):
+        requested = self.headers.get("Range")
+        self.ranges.append(requested)
+        if_range = self.headers.get("If-Range")
+        # RFC 9110: a weak or stale validator in If-Range means the whole file is sent
+        range_valid = if_range is None or (if_range == self.etag and not self.etag.startswith("W/"))
+        if requested is None or not self.honor_ranges or not range_valid:
+            self._headers(200, len(DATA))
+            self.wfile.write(DATA)
+            return
+        start, end = re.match(r"bytes=(\d+)-(\d*)", requested).groups()
+        start, end = int(start), int(end) if end else len(DATA) - 1
+        body = DATA[start:end + 1]
+        self._headers(206, len(body), {"Content-Range": f"bytes {start}-{end}/{len(DATA)}"})
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def server():
+    RangedHandler.head_allowed = True
+    RangedHandler.honor_ranges = True
+    RangedHandler.etag = '"v1"'
+    RangedHandler.ranges = []
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), RangedHandler)
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}/NIMSetup.exe"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _download(url, tmp_path, **kwargs):
+    dest_dir = tmp_path / "dest"
+    dest_dir.mkdir(exist_ok=True)
+    return install.download_installer(url, str(dest_dir), cache_dir=str(tmp_path / "cache"), **kwargs)
+
+
+def test_segmented_download(server, tmp_path):
+    path = _download(server, tmp_path, sha256=DATA_SHA256, segments=3)
+    assert Path(path).read_bytes() == DATA
+    assert len([r for r in RangedHandler.ranges if r]) == 3
+
+
+def test_cached_download_is_not_fetched_again(server, tmp_path):
+    _download(server, tmp_path, sha256=DATA_SHA256)
+    RangedHandler.ranges = []
+    path = _download(server, tmp_path, sha256=DATA_SHA256)
+    assert Path(path).read_bytes() == DATA
+    assert RangedHandler.ranges == []
+
+
+def test_interrupted_download_resumes(server, tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir()
+    key = hashlib.sha256(f'{server}\n"v1"'.encode("utf-8")).hexdigest()
+    (cache_dir / f"{key}.part1-0").write_bytes(DATA[:1000])
+    path = _download(server, tmp_path, sha256=DATA_SHA256)
+    assert Path(path).read_bytes() == DATA
+    assert RangedHandler.ranges == [f"bytes=1000-{len(DATA) - 1}"]
+
+
+def test_checksum_mismatch(server, tmp_path):
+    with pytest.raises(Exception, match="Checksum mismatch"):
+        _download(server, tmp_path, sha256="0" * 64)
+    assert os.listdir(tmp_path / "cache") == []
+
+
+def test_probe_falls_back_when_head_is_rejected(server, tmp_path):
+    RangedHandler.head_allowed = False
+    assert install._probe_download(server) == (len(DATA), '"v1"', True)
+    path = _download(server, tmp_path, sha256=DATA_SHA256, segments=2)
+    assert Path(path).read_bytes() == DATA
+
+
+def test_weak_etag_is_not_sent_as_if_range(server, tmp_path):
+    RangedHandler.etag = 'W/"v1"'
+    path = _download(server, tmp_path, sha256=DATA_SHA256, segments=3)
+    assert Path(path).read_bytes() == DATA
+    assert len([r for r in RangedHandler.ranges if r]) == 3
+
+
+def test_ignored_ranges_fall_back_to_a_single_download(server, tmp_path):
+    RangedHandler.honor_ranges = False
+    path = _download(server, tmp_path, sha256=DATA_SHA256, segments=3)
+    assert Path(path).read_bytes() == DATA
+    assert not [name for name in os.listdir(tmp_path / "cache") if ".part" in name]
@@ -0,0 +1,105 @@
+import importlib
+import json
+import subprocess
+import sys
+import threading
+import types
+from pathlib import Path
+
+import pytest
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "nimnodes_placement_tests"
+BASE_PORT = 47000
+GB = 1024**3
+
+# import placement.py as part of the package without running __init__.py, which registers the ComfyUI nodes
+package = types.ModuleType(PACKAGE)
+package.__path__ = [str(REPO_DIR)]
+sys.modules[PACKAGE] = package
+placement = importlib.import_module(f"{PACKAGE}.placement")
+
+
+def _gpu(index, free_gb, utilization=0):
+    return {"index": index, "uuid": f"GPU-{index}", "name": "Fake GPU", "total": 48 * GB, "free": free_gb * GB, "utilization": utilization}
+
+
+@pytest.fixture
+def gpus(monkeypatch):
+    devices = []
+    monkeypatch.setattr(placement, "get_gpu_memory_info", lambda: list(devices))
+    monkeypatch.setattr(placement, "_port_in_use", lambda port: False)
+    return devices
+
+
+@pytest.fixture
+def state_path(tmp_path):
+    return str(tmp_path / "placements.json")
+
+
+def test_reserve_and_release(gpus, state_path):
+    planner = placement.PlacementPlanner(BASE_PORT, state_path)
+    first = planner.reserve("FLUX_DEV")
+    second = planner.reserve("FLUX_CANNY")
+    assert (first["port"], second["port"]) == (BASE_PORT, BASE_PORT + 1)
+    assert first["gpu_index"] is None and first["gpu_uuid"] is None
+
+    planner.release(first["port"])
+    assert planner.reserve("FLUX_DEPTH")["port"] == BASE_PORT
+    with open(state_path, encoding="utf-8") as f:
+        assert sorted(json.load(f)["reservations"]) == [str(BASE_PORT), str(BASE_PORT + 1)]
+
+
+def test_ports_in_use_are_skipped(gpus, state_path, monkeypatch):
+    monkeypatch.setattr(placement, "_port_in_use", lambda port: port == BASE_PORT)
+    assert placement.PlacementPlanner(BASE_PORT, state_path).reserve("FLUX_DEV")["port"] == BASE_PORT + 1
+
+
+def test_planners_sharing_a_state_file_never_hand_out_the_same_port(gpus, state_path):
+    planners = [placement.PlacementPlanner(BASE_PORT, state_path) for _ in range(2)]
+    ports = []
+
+    def reserve(planner):
+        for _ in range(10):
+            ports.append(planner.reserve("FLUX_DEV")["port"])
+
+    threads = [threading.Thread(target=reserve, args=(planners[i % 2],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(ports) == 80
+    assert len(set(ports)) == 80
+
+
+def test_reservations_of_exited_processes_are_pruned(gpus, state_path):
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    with open(state_path, "w", encoding="utf-8") as f:
+        json.dump({"reservations": {str(BASE_PORT): {"model": "FLUX_DEV", "pid": process.pid, "port": BASE_PORT}}}, f)
+
+    planner = placement.PlacementPlanner(BASE_PORT, state_path)
+    assert planner.reserve("FLUX_CANNY")["port"] == BASE_PORT
+
+
+def test_model_returns_to_its_previous_gpu(gpus, state_path):
+    planner = placement.PlacementPlanner(BASE_PORT, state_path)
+    gpus.extend([_gpu(0, 40), _gpu(1, 20)])
+    first = planner.reserve("FLUX_DEV", vram_needed_gb=12)
+    assert first["gpu_index"] == 0
+    planner.release(first["port"])
+
+    # GPU 1 now has more free memory, but GPU 0 still fits the model
+    gpus[:] = [_gpu(0, 16), _gpu(1, 40)]
+    assert planner.reserve("FLUX_DEV", vram_needed_gb=12)["gpu_index"] == 0
+    # other models go to the least loaded GPU
+    assert planner.reserve("SD35L_BASE", vram_needed_gb=12)["gpu_index"] == 1
+
+
+def test_model_moves_when_its_previous_gpu_is_full(gpus, state_path):
+    planner = placement.PlacementPlanner(BASE_PORT, state_path)
+    gpus.extend([_gpu(0, 40), _gpu(1, 20)])
+    planner.release(planner.reserve("FLUX_DEV", vram_needed_gb=12)["port"])
+
+    gpus[:] = [_gpu(0, 8), _gpu(1, 40)]
+    assert planner.reserve("FLUX_DEV", vram_needed_gb=12)["gpu_index"] == 1
@@ -0,0 +1,45 @@
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("numpy")
+
+REPO_DIR = Path(__file__).resolve().parent.parent
+PACKAGE = "nimnodes_tiling_tests"
+
+# the node package creates its NIMManager on first use, so importing it starts nothing
+spec = importlib.util.spec_from_file_location(PACKAGE, REPO_DIR / "__init__.py", submodule_search_locations=[str(REPO_DIR)])
+nodes = importlib.util.module_from_spec(spec)
+sys.modules[PACKAGE] = nodes
+spec.loader.exec_module(nodes)
+
+
+@pytest.mark.parametrize("length, tile, overlap", [(2048, 1024, 128), (8192, 1024, 64), (3000, 1568, 200), (700, 672, 32)])
+def test_tile_starts_cover_with_overlap(length, tile, overlap):
+    starts = nodes._tile_starts(length, tile, overlap)
+    assert starts[0] == 0
+    assert starts[-1] == length - tile
+    assert all(b - a <= tile - overlap for a, b in zip(starts, starts[1:]))
+
+
+def test_tile_starts_single_tile():
+    assert nodes._tile_starts(1024, 1024, 128) == [0]
+    assert nodes._tile_starts(800, 1024, 128) == [0]
+
+
+def test_feather_ramp_edges():
+    ramp = nodes._feather_ramp(10, 3, fade_in=True, fade_out=True)
+    assert torch.allclose(ramp[:3], torch.tensor([0.25, 0.5, 0.75]))
+    assert torch.all(ramp[3:7] == 1)
+    assert torch.allclose(ramp[7:], torch.tensor([0.75, 0.5, 0.25]))
+    assert torch.all(nodes._feather_ramp(10, 3, fade_in=False, fade_out=False) == 1)
+
+
+def test_feather_ramps_of_overlapping_tiles_sum_to_one():
+    tile, overlap = 16, 4
+    first = nodes._feather_ramp(tile, overlap, fade_in=False, fade_out=True)
+    second = nodes._feather_ramp(tile, overlap, fade_in=True, fade_out=False)
+    assert torch.allclose(first[tile - overlap:] + second[:overlap], torch.ones(overlap))